@@ -0,0 +1,72 @@
+"""
+Benchmark the columnar copies against the original readers.
+
+For every source in the data folder, the original reader and the columnar
+copy are loaded in a fresh subprocess each, to measure the load time and the
+growth of the peak resident set size (RSS) caused by the read. The columnar
+copies are created on the first run, if they do not exist yet.
+
+Run it like:
+
+.. code-block:: bash
+
+    python dev/benchmark_columnar.py --datapath=./data --repeat=3
+
+"""
+import os
+import sys
+import json
+import subprocess
+
+import fire
+
+from ruins.core import Config, DataManager
+
+
+_CHILD = """
+import sys, time, json, resource
+from ruins.core import Config, DataManager
+
+conf = Config(datapath=sys.argv[1])
+dm = DataManager(**conf, columnar=sys.argv[3] == 'columnar')
+src = dm[sys.argv[2]]
+rss0 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+t1 = time.perf_counter()
+data = src.read()
+if hasattr(data, 'load'):
+    data.load()
+t2 = time.perf_counter()
+
+# ru_maxrss is reported in kB on Linux - report the peak growth caused by the read
+print(json.dumps(dict(time=t2 - t1, rss=(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss0) / 1024)))
+"""
+
+
+def _measure(datapath: str, name: str, mode: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', _CHILD, datapath, name, mode], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def benchmark(datapath: str = None, repeat: int = 3):
+    """Print load time and peak RSS of original readers and columnar copies"""
+    conf = Config() if datapath is None else Config(datapath=datapath)
+    datapath = conf.datapath
+
+    # create the columnar copies
+    dm = DataManager(**conf, columnar=True)
+    names = [n for n in dm.datasources if dm[n].columnar]
+    for name in names:
+        dm[name].read()
+
+    print(f"{'source':<40} {'reader':<10} {'time [s]':>10} {'+RSS [MB]':>10}")
+    for name in names:
+        for mode in ('original', 'columnar'):
+            results = [_measure(datapath, name, mode) for _ in range(repeat)]
+            t = min(r['time'] for r in results)
+            rss = min(r['rss'] for r in results)
+            print(f"{name:<40} {mode:<10} {t:>10.3f} {rss:>10.1f}")
+
+
+if __name__ == '__main__':
+    fire.Fire(benchmark)
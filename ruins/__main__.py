@@ -0,0 +1,19 @@
+"""
+Command line interface of RUINSapp.
+
+.. code-block:: bash
+
+    ruins warm-cache --datapath=./data --workers=4
+    python -m ruins warm-cache
+
+"""
+from ruins.core.warmup import warm_cache
+
+
+def main():
+    import fire
+    fire.Fire({'warm-cache': warm_cache})
+
+
+if __name__ == '__main__':
+    main()
@@ -113,7 +113,12 @@ def user_input_defaults():
 
 def timeslice_observed_data(dataManager: DataManager, t1, t2, slr, prec_increase, prec_line):
     
-    extremes = dataManager['hydro_krummh'].read()
+    # load only the needed variables, including 12 hours ahead of t1 for the rolling mean
+    extremes = dataManager.filter(
+        'hydro_krummh',
+        columns=[prec_line, 'wl_Knock_Outer', 'wl_LW', 'Knock_pump_obs'],
+        time=slice(pd.Timestamp(t1) - pd.Timedelta('12h'), pd.Timestamp(t2) + pd.Timedelta('1D'))
+    )
     # recharge
     hourly_recharge = extremes[prec_line].to_dataframe().rolling("12h").mean()[t1:t2].squeeze() * prec_increase # changed by Jonas
     # tide data
@@ -8,11 +8,16 @@ from plotly.subplots import make_subplots
 import numpy as np
 
 from ruins.core import build_config, debug_view, DataManager, Config
+from ruins.core.cache import partial_memoize
 from ruins.plotting import pdsi_plot, tree_plot, variable_plot, windpower_distplot, ternary_provision_plot, management_scatter_plot
 from ruins.processing.pdsi import multiindex_pdsi_data
 from ruins.processing.windpower import windpower_actions_projection, create_action_grid, uncertainty_analysis
 
 
+# default period of the upscaled windpower filter
+DEFAULT_YEARS = (2075, 2095)
+
+
 _TRANSLATE_EN = dict(
     title='Land use, climate change & uncertainty',
     introduction="""
@@ -130,8 +135,11 @@ def quick_access(config: Config, container=st.sidebar) -> None:
         st.experimental_rerun()
 
 
-@st.experimental_memo
-def cached_pdsi_plot(_data, group_by: List[str] = None, add_tree: bool = True, lang='de'):
+@partial_memoize(hash_names=['group_by', 'add_tree', 'lang'], sources=['pdsi'])
+def cached_pdsi_plot(dataManager: DataManager, group_by: List[str] = None, add_tree: bool = True, lang='de'):
+    # load the data
+    _data = dataManager.read('pdsi').dropna()
+
     # build the multiindex and group if needed
     if group_by is not None:
         _data = multiindex_pdsi_data(_data, grouping=group_by, inplace=True)
@@ -171,11 +179,8 @@ def drought_index(dataManager: DataManager, config: Config) -> None:
     else:
         add_tree = False
 
-    # load the data
-    pdsi = dataManager.read('pdsi').dropna()
-
     # use the cached version
-    fig = cached_pdsi_plot(pdsi, group_by=group_by, add_tree=add_tree)
+    fig = cached_pdsi_plot(dataManager, group_by=group_by, add_tree=add_tree)
 
     # add the figure
     st.plotly_chart(fig, use_container_width=True)
@@ -221,14 +226,11 @@ def upscaled_data_filter(dataManager: DataManager, expert_mode: bool = False, ke
     filt['joint'] = container.checkbox('Use only data available for all RCPs (N=16)', value=False, key=f'{key}_joint_checkbox')
     
     # filter by year
-    _year  = container.slider('Years', value=[2075, 2095], min_value=2006, max_value=2099, step=1, key=f'{key}_year_slider')
+    _year  = container.slider('Years', value=list(DEFAULT_YEARS), min_value=2006, max_value=2099, step=1, key=f'{key}_year_slider')
     filt['year'] = slice(str(_year[0]), str(_year[1]))
 
     # this stuff is only expert mode
     if expert_mode:
-        # get the data to filter for options
-        ts = dataManager.read('wind_timeseries')
-        
         # filter RCP
         RCP = {'all': 'All RCPs', 'rcp26': 'RCP 2.6', 'rcp45': 'RCP 4.5', 'rcp85': 'RCP 8.5'}
         _rcp = container.select_slider('Select RCP scenario', options=list(RCP.keys()), value='all', format_func=lambda k: RCP.get(k), key=f'{key}_rcp_slider')
@@ -236,20 +238,14 @@ def upscaled_data_filter(dataManager: DataManager, expert_mode: bool = False, ke
             filt['rcp'] = _rcp
 
         if not filt['joint']:
-            # filter GCMs
-            if _rcp != 'all':
-                gcms = ts[ts.RCP == _rcp].GCM.unique()
-            else:
-                gcms = ts.GCM.unique()
+            # filter GCMs - the options are queried from the source
+            gcms = dataManager.filter('wind_timeseries', columns=['GCM'], attrs={'RCP': _rcp} if _rcp != 'all' else None).GCM.unique()
             _gcm = container.selectbox('Filter by GCM', options=['- all -', *gcms], format_func=lambda k: k.upper(), key=f'{key}_gcm_selectbox')
             if _gcm != '- all -':
                 filt['gcm'] = _gcm
 
             # filter RCMSs
-            if _gcm != '- all -':
-                rcms = ts[ts.GCM == _gcm].RCM.unique()
-            else:
-                rcms = ts.RCM.unique()
+            rcms = dataManager.filter('wind_timeseries', columns=['RCM'], attrs={'GCM': _gcm} if _gcm != '- all -' else None).RCM.unique()
             _rcm = container.selectbox('Filter by RCM', options=['- all -', *rcms], format_func=lambda k: k.upper(), key=f'{key}_rcm_selectbox')
             if _rcm != '- all -':
                 filt['rcm'] = _rcm
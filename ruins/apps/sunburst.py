@@ -4,10 +4,15 @@ import streamlit as st
 import pandas as pd
 
 from ruins.core import build_config, debug_view, Config, DataManager
+from ruins.core.cache import partial_memoize
 from ruins.plotting import sunburst
 from ruins.processing.sunburst import ordered_sunburst_data
 
 
+# selectable orders of the model levels
+ORDERS = (['GCM', 'RCM', 'RCP'], ['RCP', 'GCM', 'RCM'], ['RCM', 'GCM', 'RCP'])
+
+
 _TRANSLATE_DE = dict(
     title='Verwendete Klimamodelle',
     intro="""Es gibt eine Vielzahl an unterschiedlichen Klimamodellen,
@@ -37,7 +42,7 @@ def plot_controls(config: Config, expander=st.sidebar) -> None:
     """Add the controls to the application"""
     with expander.expander('Hierachie' if config.lang=='de' else 'Hierachy', expanded=True):
         # set the order 
-        o = st.radio('Reihenfolge' if config.lang=='de' else 'Order', options=['GCM -> RCM -> RCP', 'RCP -> GCM -> RCM', 'RCM -> GCM -> RCP'])
+        o = st.radio('Reihenfolge' if config.lang=='de' else 'Order', options=[' -> '.join(order) for order in ORDERS])
         st.session_state.sunburst_order = o.split(' -> ')
 
         # set the level
@@ -51,7 +56,7 @@ def plot_controls(config: Config, expander=st.sidebar) -> None:
         ) 
 
 
-@st.experimental_memo
+@partial_memoize(hash_names=['order'], sources=['climate'], manager='_dataManager', store='disk')
 def get_cached_data(_dataManager: DataManager, order: List[str]) -> pd.DataFrame:
     return ordered_sunburst_data(_dataManager, order)
 
@@ -11,7 +11,8 @@ from ruins.plotting import kde, yrplot_hm, climate_projection_parcoords, plot_cl
 from ruins.components import data_select, model_scale_select
 from ruins.core import build_config, debug_view, DataManager, Config
 from ruins.core.cache import partial_memoize
-from ruins.processing.climate_indices import calculate_climate_indices, INDICES
+from ruins.core.aggregates import normalize_freq, SUFFIX
+from ruins.processing.climate_indices import calculate_climate_indices, index_variable, INDICES
 
 
 _TRANSLATE_DE_CLIMATE = dict(
@@ -101,12 +102,7 @@ def climate_indices(dataManager: DataManager, config: Config, container=st, key:
 
     # Index selection
     ci = right.selectbox('Climate Index', options=list(INDICES.keys()), format_func= lambda k: INDICES.get(k), key=f'climate_index_{key}')
-    if ci == 'prec':
-        vari = 'Prec'
-    elif ci in ('frost', 'tropic'):
-        vari = 'Tmin'
-    else:
-        vari = 'Tmax'
+    vari = index_variable(ci)
 
     # calculate the stuff
     data = calculate_climate_indices(dataManager, station=station_name, variable=vari, ci=ci)
@@ -132,28 +128,20 @@ def climate_indices(dataManager: DataManager, config: Config, container=st, key:
     return
 
 
-@partial_memoize(hash_names=['name', 'station', 'variable', 'time', '_filter'])
+@partial_memoize(hash_names=['name', 'station', 'variable', 'time', '_filter'], sources=lambda args: [args['name'], f"{args['name']}{SUFFIX}"], store='disk')
 def _reduce_weather_data(dataManager: DataManager, name: str, variable: str, time: str, station: str = None, _filter: dict = None) -> pd.DataFrame:
-    # get weather data
-    arr: xr.Dataset = dataManager.read(name)
-
-    if _filter is not None:
-        arr = arr.filter_by_attrs(**_filter)
+    # switch the aggregation
+    how = {'Tmax': 'max', 'Tmin': 'min'}.get(variable, 'mean')
 
-    if station is None:
-        base = arr
+    # monthly and annual aggregates are precomputed
+    if normalize_freq(time) is not None:
+        df = dataManager.aggregate(name, variable, freq=time, how=how, station=station, attrs=_filter).to_dataframe()
     else:
-        base = arr[station]
-
-    # reduce to station and variable
-    reduced = base.sel(vars=variable).resample(time=time)
+        # get weather data, reduced to station and variable
+        base = dataManager.filter(name, station=station, vars=variable, attrs=_filter)
 
-    if variable == 'Tmax':
-        df = reduced.max(dim='time').to_dataframe()
-    elif variable == 'Tmin':
-        df = reduced.min(dim='time').to_dataframe()
-    else:
-        df = reduced.mean(dim='time').to_dataframe()
+        # aggregate
+        df = getattr(base.resample(time=time), how)(dim='time').to_dataframe()
     
     if station is None:
         return df.loc[:, df.columns != 'vars']
@@ -191,31 +179,31 @@ def climate_data_selector(dataManager: DataManager, config: Config, it: int = 0,
 
     # make the data sub-selection
     if ref == 'weather':
-        data = dataManager.read('weather')
+        name = 'weather'
         drngx = (1980, 2000)
     else:
-        data = dataManager.read('climate')
+        name = 'climate'
         drngx = (2050, 2070)
 
     # filter for rcps
-    if ref in ('rcp26', 'rcp45', 'rcp85'):
-        data = data.filter_by_attrs(RCP=ref)
-
-    # create the data range slider
-    drng = [pd.to_datetime(data.isel(time=0, vars=1).time.values).year, pd.to_datetime(data.isel(time=-1, vars=1).time.values).year]
-    datarng = expander_container.slider('Date Range', drng[0], drng[1], drngx, key=f'dr{it}')
+    attrs = dict(RCP=ref) if ref in ('rcp26', 'rcp45', 'rcp85') else None
 
     # switch the variable
     if variable == 'T':
-        afu = np.mean
+        how = 'mean'
     elif variable == 'Tmin':
-        afu = np.min
+        how = 'min'
     elif variable == 'Tmax':
-        afu = np.max
+        how = 'max'
+
+    # get the precomputed monthly aggregates
+    dyp = dataManager.aggregate(name, variable, freq='M', how=how, attrs=attrs).to_dataframe()
+
+    # create the data range slider
+    drng = [dyp.index[0].year, dyp.index[-1].year]
+    datarng = expander_container.slider('Date Range', drng[0], drng[1], drngx, key=f'dr{it}')
 
-    # aggregate
-    dyp = data.sel(vars=variable).to_dataframe().resample('1M').apply(afu)
-    dyp = dyp.loc[(dyp.index.year>=datarng[0]) & (dyp.index.year<datarng[1]),dyp.columns[dyp.columns!='vars']]
+    dyp = dyp.loc[(dyp.index.year>=datarng[0]) & (dyp.index.year<datarng[1])]
 
     # plot
     fig = climate_projection_parcoords(data=dyp, colorscale=kwargs.get('colorscale', 'electric'))
@@ -0,0 +1,117 @@
+"""
+Precomputed temporal aggregation pyramid of station and model data.
+
+The daily datasets are aggregated to monthly and annual minimum, mean,
+maximum and sum for every data variable (stations, climate models) and
+every ``vars`` entry. The pyramid of a source ``<name>`` is stored as its
+own source ``<name>_pyramid.nc`` next to the original file, with the
+additional dimensions ``freq`` and ``how``. Monthly and annual aggregates
+share the time axis of month ends, annual values are stored at the end of
+December. The scalar coordinate ``end_M`` marks the last month, as the
+annual aggregates of an incomplete last year extend the time axis.
+The :class:`DataManager <ruins.core.DataManager>` serves the aggregates through :func:`aggregate <ruins.core.DataManager.aggregate>`.
+
+Build the pyramids for all sources in the data folder like:
+
+.. code-block:: bash
+
+    python -m ruins.core.aggregates --datapath=./data
+
+"""
+from typing import List
+import os
+
+import xarray as xr
+
+
+FREQS = {'M': 'ME', 'Y': 'YE'}
+HOWS = ('min', 'mean', 'max', 'sum')
+
+# suffix of the pyramid sources
+SUFFIX = '_pyramid'
+
+# pandas aliases of the supported frequencies
+ALIASES = {
+    'M': ('M', '1M', 'ME', '1ME'),
+    'Y': ('Y', '1Y', 'YE', '1YE', 'A', '1A')
+}
+
+
+def normalize_freq(freq: str) -> str:
+    """Map a pandas frequency alias to ``'M'`` or ``'Y'``, None if the frequency is not in the pyramid"""
+    for key, aliases in ALIASES.items():
+        if freq in aliases:
+            return key
+    return None
+
+
+def aggregate_dataset(data: xr.Dataset, freq: str, how: str) -> xr.Dataset:
+    """
+    Aggregate daily data to the given frequency. The time labels are the
+    ends of the periods, like :func:`pandas.DataFrame.resample` with ``'1M'``
+    or ``'1Y'``. The attributes of the variables are kept.
+    """
+    if how not in HOWS:
+        raise ValueError(f"how has to be one of {', '.join(HOWS)}")
+    resampled = data.resample(time=FREQS[normalize_freq(freq) or freq])
+
+    if how == 'sum':
+        return resampled.sum(dim='time', min_count=1, keep_attrs=True)
+    return getattr(resampled, how)(dim='time', keep_attrs=True)
+
+
+def build_pyramid(data: xr.Dataset) -> xr.Dataset:
+    """
+    Build the aggregation pyramid of a daily dataset. The annual aggregates
+    are calculated from the daily values, to keep means exact for months of
+    different length and missing values.
+    """
+    levels = []
+    for freq in FREQS.keys():
+        level = xr.concat([aggregate_dataset(data, freq, how) for how in HOWS], dim=xr.Variable('how', list(HOWS)))
+        levels.append(level)
+
+    pyramid = xr.concat(levels, dim=xr.Variable('freq', list(FREQS.keys())), join='outer')
+    pyramid.attrs.update(data.attrs)
+    return pyramid.assign_coords(end_M=levels[0].time.values[-1])
+
+
+def pyramid_selection(pyramid: xr.Dataset, freq: str) -> xr.Dataset:
+    """Select the time steps of freq from a (filtered) pyramid"""
+    if normalize_freq(freq) == 'Y':
+        return pyramid.sel(time=pyramid.time.dt.month == 12)
+    return pyramid.sel(time=slice(None, pyramid.end_M.values))
+
+
+def build_pyramids(datapath: str = None, names: List[str] = None) -> List[str]:
+    """
+    Build the aggregation pyramids for the given sources, or all daily
+    sources with a ``time`` and ``vars`` dimension. The pyramids are
+    written next to the source files and the paths are returned.
+    """
+    from ruins.core import Config, DataManager
+    conf = Config() if datapath is None else Config(datapath=datapath)
+    dm = DataManager(**conf)
+
+    if names is None:
+        names = [n for n in dm.datasources if not n.endswith(SUFFIX) and dm[n].__class__.__name__ in ('HDF5Source', 'ZarrSource')]
+
+    paths = []
+    for name in names:
+        data = dm.read(name)
+        if not isinstance(data, xr.Dataset) or not {'time', 'vars'}.issubset(data.dims):
+            continue
+
+        path = os.path.join(os.path.dirname(dm[name].path), f'{name}{SUFFIX}.nc')
+        print(f'Building {path}...', end='', flush=True)
+        build_pyramid(data.load()).to_netcdf(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+        print('done.', flush=True)
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(build_pyramids)
@@ -5,28 +5,38 @@ Build a :class:`Config <ruins.core.Config>` and a
 from typing import Union, Tuple, Dict, List
 import os
 import shutil
-import requests
-import io
-import zipfile
-import streamlit as st
 
 from .config import Config
 from .data_manager import DataManager
+from .registry import REGISTRY, FINGERPRINT_KEYS, is_source_class
+from .download import download_file, extract_archive, zenodo_archive
 
 
-st.experimental_singleton
 def contextualized_data_manager(**kwargs) -> DataManager:
-    return DataManager(**kwargs)
+    """
+    Return the process-wide shared DataManager for this config.
+    See :class:`DataManagerRegistry <ruins.core.registry.DataManagerRegistry>`.
+    """
+    return REGISTRY.get(**kwargs)
 
 
-def build_config(omit_dataManager: bool = False, url_params: Dict[str, List[str]] = {}, **kwargs) -> Tuple[Config, Union[None, DataManager]]:
+def url_kwargs(url_params: Dict[str, List[str]]) -> dict:
     """
+    Config kwargs from the URL query parameters. Parameters configuring the
+    DataManager or the class of a source are dropped, as visitors must not
+    create new DataManagers or choose paths of the server. Only ``debug``
+    is kept, the Config reduces it to a flag.
     """
-    # prepare the url params, if any
     # url params are always a list: https://docs.streamlit.io/library/api-reference/utilities/st.experimental_get_query_params
-    # TODO: This should be sanitzed to avoid injection attacks!
     ukwargs = {k: v[0] if len(v) == 1 else v for k, v in url_params.items()}
-    kwargs.update(ukwargs)
+    return {k: v for k, v in ukwargs.items() if k == 'debug' or (k not in FINGERPRINT_KEYS and k != 'basepath' and not (isinstance(v, str) and is_source_class(v)))}
+
+
+def build_config(omit_dataManager: bool = False, url_params: Dict[str, List[str]] = {}, **kwargs) -> Tuple[Config, Union[None, DataManager]]:
+    """
+    """
+    # prepare the url params, if any
+    kwargs.update(url_kwargs(url_params))
 
     # extract the DataManager, if it was already instantiated
     if 'dataManager' in kwargs:
@@ -45,12 +55,17 @@ def build_config(omit_dataManager: bool = False, url_params: Dict[str, List[str]
         return config, dataManager
 
 
-def download_data_archive(path: str = None, url: str = 'http://116.203.189.3/data.zip', DOI: str = None, if_exists: str = 'error'):
+def download_data_archive(path: str = None, url: str = 'http://116.203.189.3/data.zip', DOI: str = None, if_exists: str = 'error', checksum: str = None, workers: int = 4, keep_archive: bool = False):
     """Download the data archive and extract into the data folder.
     If the path is None, the default path inside the repo itself is used.
     Then, you also need to change the datapath property of the application config.
     If the data folder already exists and is not empty, the function will error on default.
     You can pass ``if_exists='prune'`` to remove the existing data folder and replace it with the new one.
+
+    The archive is streamed to disk next to the data folder. An interrupted
+    download is resumed on the next call. If a DOI is given, the archive is
+    verified against the checksum of the Zenodo record, otherwise against
+    ``checksum``, if given. The members are extracted by ``workers`` threads.
     """
     # use default path if none was provided
     if path is None:
@@ -68,32 +83,22 @@ def download_data_archive(path: str = None, url: str = 'http://116.203.189.3/dat
     
     # check which download route is used:
     if DOI is None:
-        # now the data folder exists - download the archive
-        print(f'Found Server URL: {url}\nStart downloading...', end='', flush=True)
-        
-        req = requests.get(url, stream=True)
-        zip = zipfile.ZipFile(io.BytesIO(req.content))
-
-        print(f'done.\nExtracting to {path}...', end='', flush=True)
-        zip.extractall(os.path.abspath(os.path.join(path, '..')))
-        print('done.', flush=True)
+        print(f'Found Server URL: {url}\nStart downloading...', flush=True)
     else:
-        # now the data folder exists - download the archive
-        print(f'Found DOI: {DOI}\nStart downloading...', end='', flush=True)
-
-        # Build the URL from Zenodo DOI
-        chunk = DOI.split('/')[-1]
-        record = chunk.split('.')[1]
-
-        # request the existing data from Zenodo API
-        dat = requests.get(f'https://zenodo.org/api/records/{record}').json()
-        for f in dat['files']:
-            if f['type'] == 'zip':
-                req = requests.get(f['links']['self'], stream=True)
-                zip = zipfile.ZipFile(io.BytesIO(req.content))
-
-                # extract the data to the data folder
-                print(f'done.\nExtracting to {path}...', end='', flush=True)
-                zip.extractall(os.path.abspath(os.path.join(path, '..')))
-                print('done.', flush=True)
-                break
+        print(f'Found DOI: {DOI}\nStart downloading...', flush=True)
+
+        # get the archive from the Zenodo API
+        meta = zenodo_archive(DOI)
+        url, checksum = meta['url'], meta['checksum']
+
+    # stream the archive to disk
+    parent = os.path.abspath(os.path.join(path, '..'))
+    archive = os.path.join(parent, f'.{os.path.basename(path)}.zip')
+    download_file(url, archive, checksum=checksum)
+
+    # extract the data to the data folder
+    print(f'Extracting to {path}...', flush=True)
+    extract_archive(archive, parent, workers=workers)
+    if not keep_archive:
+        os.remove(archive)
+    print('done.', flush=True)
@@ -1,33 +1,530 @@
-from typing import Callable, List
+"""
+Memoization of expensive computations.
+
+Functions decorated with :func:`partial_memoize` cache their results,
+keyed by the values of the parameters listed in ``hash_names``. Other
+parameters, like the DataManager, are not part of the key. The arguments
+are bound to the function signature, thus positional, keyword and default
+arguments result in the same key.
+
+Each decorated function holds its own bounded LRU cache. Results are
+evicted once ``max_entries`` or ``max_bytes`` is exceeded, or after
+``ttl`` seconds.
+
+Functions reading from a :class:`DataManager <ruins.core.DataManager>`
+list the read sources in ``sources``. The version tokens of these sources
+are part of the key, see :func:`version <ruins.core.DataManager.version>`.
+Thus, updated data or another DataManager results in new keys, while
+results of unaffected sources are still served.
+
+With ``store='disk'``, the results are additionally persisted into a
+cache folder, see :class:`DiskStore`. Thus, restarted apps and other
+processes sharing the folder don't compute them again.
+
+.. code-block:: python
+
+    @partial_memoize(hash_names=['station', 'variable'], sources=['weather'], max_entries=64, ttl=3600)
+    def expensive(dataManager, station, variable):
+        ...
+
+    expensive.cache.stats()
+    cache_stats()
+
+"""
+from typing import Any, Callable, Dict, List, Tuple, Union
 from functools import wraps
+from collections import OrderedDict
+from concurrent.futures import Future
+import os
+import re
+import sys
+import time
+import pickle
+import inspect
 import hashlib
+import warnings
+import threading
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+def _canonical(value: Any) -> str:
+    """Stable string representation of value, independent of dict and set order"""
+    if isinstance(value, dict):
+        items = sorted((_canonical(k), _canonical(v)) for k, v in value.items())
+        return '{' + ','.join(f'{k}:{v}' for k, v in items) + '}'
+    elif isinstance(value, (list, tuple)):
+        return f'{type(value).__name__}(' + ','.join(_canonical(v) for v in value) + ')'
+    elif isinstance(value, (set, frozenset)):
+        return 'set(' + ','.join(sorted(_canonical(v) for v in value)) + ')'
+    elif isinstance(value, slice):
+        return f'slice({_canonical(value.start)},{_canonical(value.stop)},{_canonical(value.step)})'
+    elif isinstance(value, np.ndarray):
+        return f'ndarray({value.dtype},{value.shape},{hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()})'
+    elif isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        # names and dtypes are not part of the row hashes, the row order is kept
+        if isinstance(value, pd.DataFrame):
+            schema = [list(value.columns), [str(t) for t in value.dtypes], list(value.index.names)]
+        else:
+            schema = [value.name, str(value.dtype), list(value.index.names) if isinstance(value, pd.Series) else None]
+        rows = pd.util.hash_pandas_object(value, index=True).to_numpy()
+        return f'{type(value).__name__}({_canonical(schema)},{hashlib.sha256(rows.tobytes()).hexdigest()})'
+    return f'{type(value).__name__}:{value!r}'
+
+
+def stable_hash(*parts: Any) -> str:
+    """SHA-256 hash of the canonical representation of parts"""
+    return hashlib.sha256(_canonical(parts).encode()).hexdigest()
+
+
+def sizeof(value: Any) -> int:
+    """Estimate the in-memory size of a cached result in bytes"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) else int(value.memory_usage(deep=True))
+    elif isinstance(value, (xr.Dataset, xr.DataArray)):
+        return int(value.nbytes)
+    elif isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    elif isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    elif isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value.values())
+
+    # figures and other objects
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+def default_cache_dir() -> str:
+    """
+    Default folder of the disk store, can be set by the ``RUINS_CACHE_DIR``
+    environment variable. Defaults to ``ruins`` in the cache folder of the
+    user, ie. ``~/.cache/ruins``.
+    """
+    if 'RUINS_CACHE_DIR' in os.environ:
+        return os.environ['RUINS_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ruins')
+
+
+def is_private(folder: str) -> bool:
+    """True if folder belongs to the current user and is not writable by group or others"""
+    stat = os.stat(folder)
+    if hasattr(os, 'getuid') and stat.st_uid != os.getuid():
+        return False
+    return stat.st_mode & 0o022 == 0
+
+
+class DiskStore:
+    """
+    Content-addressed store of results in a folder.
+
+    Each result is stored in its own file, named by its key. DataFrames are
+    written as Parquet (Arrow) files, if pyarrow is installed, numpy arrays
+    as ``.npy`` files and all other results are pickled. Files are written
+    to a temporary file first and then moved into place, thus several
+    processes can share the folder and never read partial results.
+
+    If the folder grows beyond ``max_bytes``, the least recently used
+    files are removed. Files older than ``ttl`` seconds are ignored and
+    removed.
+
+    As pickles can execute code on load, the folder is created with mode
+    ``0700`` and only used, if it belongs to the current user and can't be
+    written by others. Otherwise the store is disabled with a warning.
+    """
+    EXTENSIONS = ('.parquet', '.npy', '.pkl')
+
+    def __init__(self, folder: str, max_bytes: int = 2**30, ttl: float = None):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._usable_folder: bool = None
+
+    def _usable(self) -> bool:
+        """Create the folder, if needed, and check once that it is private"""
+        if self._usable_folder is None:
+            try:
+                os.makedirs(self.folder, mode=0o700, exist_ok=True)
+                self._usable_folder = is_private(self.folder)
+                if not self._usable_folder:
+                    warnings.warn(f"The cache folder {self.folder} is writable by other users and is not used.")
+            except OSError as e:
+                warnings.warn(f"Can't use the cache folder {self.folder}: {e}")
+                self._usable_folder = False
+        return self._usable_folder
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.folder, f'{key}{ext}')
+
+    def _files(self) -> List[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.folder) if e.is_file() and e.name.endswith(self.EXTENSIONS)]
+        except FileNotFoundError:
+            return []
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return if key was found and the stored result"""
+        if not self._usable():
+            return False, None
+        for ext in self.EXTENSIONS:
+            path = self._path(key, ext)
+            try:
+                if self.ttl is not None and os.path.getmtime(path) + self.ttl < time.time():
+                    os.remove(path)
+                    return False, None
+                result = self._read(path, ext)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # unreadable, ie. written by an incompatible version
+                self._remove(path)
+                return False, None
+
+            # mark as recently used, keep the modification time for the ttl
+            try:
+                os.utime(path, (time.time(), os.path.getmtime(path)))
+            except OSError:
+                pass
+            return True, result
+
+        return False, None
+
+    def _read(self, path: str, ext: str) -> Any:
+        if ext == '.parquet':
+            return pd.read_parquet(path)
+        elif ext == '.npy':
+            return np.load(path, allow_pickle=False)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _write(self, result: Any, tmp: str) -> str:
+        """Write result to tmp and return the extension of the used format"""
+        if isinstance(result, pd.DataFrame):
+            try:
+                result.to_parquet(tmp)
+                return '.parquet'
+            except Exception:
+                # no pyarrow, or not representable in Arrow, like non-string column names
+                pass
+        elif isinstance(result, np.ndarray) and result.dtype.kind != 'O':
+            with open(tmp, 'wb') as f:
+                np.save(f, result, allow_pickle=False)
+            return '.npy'
+
+        with open(tmp, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return '.pkl'
+
+    def set(self, key: str, result: Any) -> None:
+        """Store result under key. Errors are only warned, as the store is optional."""
+        if not self._usable():
+            return
+        tmp = os.path.join(self.folder, f'.{key}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            os.makedirs(self.folder, mode=0o700, exist_ok=True)
+            ext = self._write(result, tmp)
+            os.replace(tmp, self._path(key, ext))
+        except Exception as e:
+            warnings.warn(f"Could not store a result in {self.folder}: {e}")
+            self._remove(tmp)
+            return
+        self.cleanup()
+
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @property
+    def nbytes(self) -> int:
+        """Size of all stored results in bytes"""
+        return sum(e.stat().st_size for e in self._files())
+
+    def cleanup(self) -> None:
+        """Remove expired files and the least recently used files above max_bytes"""
+        files = []
+        for entry in self._files():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl is not None and stat.st_mtime + self.ttl < time.time():
+                self._remove(entry.path)
+            else:
+                files.append((stat.st_atime, stat.st_size, entry.path))
+
+        if self.max_bytes is None:
+            return
+        total = sum(f[1] for f in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
 
+    def clear(self) -> None:
+        """Remove all stored results"""
+        for entry in self._files():
+            self._remove(entry.path)
 
-LOCAL = dict()
 
-def _hashargs(fname, argnames):
-    h = f'{fname};' + ','.join(argnames)
-    digest = hashlib.sha256(h.encode()).hexdigest()
+class MemoCache:
+    """
+    Thread-safe LRU cache of one memoized function.
 
-    return digest
+    Concurrent computations of the same key are coalesced by
+    :func:`get_or_compute`: the first caller computes the result, all
+    others wait for it and are counted as ``deduplicated``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the cache, usually the qualified function name
+    max_entries : int
+        Maximum number of cached results. None for no limit.
+    max_bytes : int
+        Maximum estimated size of all cached results in bytes. Results
+        larger than that are not cached at all. None for no limit.
+    ttl : float
+        Seconds after which a result expires. None for no expiry.
+    disk : DiskStore
+        Optional persistent store. Results missing in memory are looked
+        up there, new results are written to both.
+
+    """
+    def __init__(self, name: str, max_entries: int = 128, max_bytes: int = None, ttl: float = None, disk: DiskStore = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk = disk
+
+        # key -> (expires, nbytes, result)
+        self._entries: OrderedDict = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self._stats = dict(hits=0, misses=0, evictions=0, expired=0, disk_hits=0, deduplicated=0)
+
+        # single-flight computations, key -> Future
+        self._inflight: Dict[str, Future] = {}
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return if key was found and the cached result"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                self._stats['expired'] += 1
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return True, entry[2]
+
+        # look up the persistent store
+        if self.disk is not None:
+            found, result = self.disk.get(key)
+            if found:
+                self._put(key, result)
+                with self._lock:
+                    self._stats['hits'] += 1
+                    self._stats['disk_hits'] += 1
+                return True, result
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return False, None
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result of key, or compute and cache it. Only one
+        computation per key runs at a time, concurrent callers wait for its
+        result, or its error.
+        """
+        found, result = self.get(key)
+        if found:
+            return result
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                # the result might have been cached since the lookup
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry[2]
+                future = self._inflight[key] = Future()
+            else:
+                self._stats['deduplicated'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = compute()
+            self.set(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return result
+
+    def set(self, key: str, result: Any) -> None:
+        """Cache result and evict the least recently used results, if over the limits"""
+        self._put(key, result)
+        if self.disk is not None:
+            self.disk.set(key, result)
+
+    def _put(self, key: str, result: Any) -> None:
+        nbytes = sizeof(result) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (expires, nbytes, result)
+            self._nbytes += nbytes
+
+            while len(self._entries) > 1 and self._over_limits():
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def _over_limits(self) -> bool:
+        if self.max_entries is not None and len(self._entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._nbytes > self.max_bytes
+
+    def _drop(self, key: str) -> None:
+        _, nbytes, _ = self._entries.pop(key)
+        self._nbytes -= nbytes
+
+    def clear(self, disk: bool = False) -> None:
+        """Drop all cached results, including the persisted ones if ``disk=True``"""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+        if disk and self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the hits, misses, evictions, expired results, deduplicated computations, number of entries and their size"""
+        with self._lock:
+            stats = dict(**self._stats, entries=len(self._entries), nbytes=self._nbytes)
+        if self.disk is not None:
+            stats['disk_nbytes'] = self.disk.nbytes
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.name}, {', '.join(f'{k}={v}' for k, v in self.stats().items())})"
+
+
+# the caches of all memoized functions by name
+CACHES: Dict[str, MemoCache] = {}
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Return the stats of all memoized functions by name"""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+def clear_caches() -> None:
+    """Drop the results of all memoized functions"""
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def data_versions(dataManager: Any, names: List[str]) -> List[Tuple[str, str]]:
+    """Version tokens of the named sources, empty if dataManager has no versions"""
+    if not hasattr(dataManager, 'version'):
+        return []
+    return [(n, dataManager.version(n)) for n in names]
+
+
+def partial_memoize(hash_names: List[str], sources: Union[List[str], Callable[[dict], List[str]]] = None, manager: str = 'dataManager', store: str = 'local', max_entries: int = 128, max_bytes: int = None, ttl: float = None, cache_dir: str = None, max_disk_bytes: int = 2**30):
+    """
+    Memoize the decorated function, keyed by the parameters in hash_names.
+
+    Parameters
+    ----------
+    hash_names : List[str]
+        Names of the parameters identifying a result. All other parameters
+        are ignored.
+    sources : List[str], Callable
+        Names of the sources read by the function, or a callable returning
+        them from the bound arguments by parameter name. Their version
+        tokens are added to the key.
+    manager : str
+        Name of the DataManager parameter, used if sources is given
+    store : str
+        Where to keep the results. ``'local'`` keeps them in memory of
+        the process, ``'disk'`` additionally persists them into
+        ``cache_dir``, see :class:`DiskStore`.
+    max_entries : int
+        Maximum number of cached results
+    max_bytes : int
+        Maximum estimated size of the cached results in bytes
+    ttl : float
+        Seconds after which a cached result expires
+    cache_dir : str
+        Folder of the disk store. Each function uses its own subfolder.
+        Defaults to :func:`default_cache_dir`.
+    max_disk_bytes : int
+        Maximum size of the subfolder of this function in bytes
+
+    Concurrent calls with the same key run the function only once. The
+    cache of the function is available as ``func.cache``, see
+    :class:`MemoCache`.
+    """
+    if store not in ('local', 'disk'):
+        raise ValueError(f"Unknown store '{store}'. Use 'local' or 'disk'.")
 
-def partial_memoize(hash_names: List[str], store: str = 'local'):
     def func_decorator(f: Callable):
+        sig = inspect.signature(f)
+        unknown = [n for n in hash_names if n not in sig.parameters]
+        if len(unknown) > 0:
+            raise ValueError(f"{f.__qualname__} has no parameter(s) {', '.join(unknown)}")
+        if sources is not None and manager not in sig.parameters:
+            raise ValueError(f"{f.__qualname__} has no DataManager parameter {manager}")
+
+        name = f'{f.__module__}.{f.__qualname__}'
+        disk = None
+        if store == 'disk':
+            folder = os.path.join(cache_dir if cache_dir is not None else default_cache_dir(), re.sub(r'[^\w.-]', '_', name))
+            disk = DiskStore(folder, max_bytes=max_disk_bytes, ttl=ttl)
+        cache = MemoCache(name, max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, disk=disk)
+        CACHES[name] = cache
+
         @wraps(f)
         def wrapper(*args, **kwargs):
-            argnames = [str(a) for a in args if a in hash_names]
-            argnames.extend([str(v) for k, v in kwargs.items() if k in hash_names])
-            
-            # get the parameter hash
-            h = _hashargs(f.__name__, argnames)
-            
-            # check if result exists
-            if h in LOCAL:
-                return LOCAL.get(h)
-            else:
-                # process
-                result = f(*args, **kwargs)
-                LOCAL[h] = result
-                return result
+            # bind the arguments to get the same key for positional, keyword and default arguments
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            parts = [(n, bound.arguments[n]) for n in hash_names]
+
+            # the versions of the read sources invalidate results of outdated data
+            if sources is not None:
+                names = sources(bound.arguments) if callable(sources) else sources
+                parts.append(data_versions(bound.arguments[manager], names))
+            key = stable_hash(name, parts)
+
+            # concurrent calls of the same key wait for the running computation
+            return cache.get_or_compute(key, lambda: f(*args, **kwargs))
+
+        wrapper.cache = cache
         return wrapper
     return func_decorator
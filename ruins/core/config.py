@@ -59,7 +59,10 @@ class Config(Mapping):
         self.default_sources = {
             'nc': 'HDF5Source',
             'csv': 'CSVSource',
-            'dat': 'DATSource'
+            'dat': 'DATSource',
+            'zarr': 'ZarrSource',
+            'parquet': 'ParquetSource',
+            'sqlite': 'DatabaseSource'
         }
         self.default_sources.update(kwargs.get('include_mimes', {}))
 
@@ -73,15 +76,19 @@ class Config(Mapping):
             'levelW.csv': dict(index_col=[0], parse_dates=[0]),
             'prec.csv': dict(index_col=[0], parse_dates=[0]),
             'Qknock.csv': dict(index_col=[0], parse_dates=[0]),
-            'scPDSI.csv': dict(index_col=[0])
+            'scPDSI.csv': dict(index_col=[0]),
+            'windenergy_timeseries.csv': dict(categorical=['RCP', 'GCM', 'RCM', 'Ensemble'])
         }
         self.sources_args.update(kwargs.get('include_args', {}))
 
+        # datasets served via HTTP(S), by name
+        self.remote_sources = {}
+
         # app management
         self.layout = 'centered'
 
         # store the keys
-        self._keys = ['debug', 'lang', 'basepath', 'datapath', 'hot_load', 'datafile_names', 'default_sources', 'sources_args', 'layout']
+        self._keys = ['debug', 'lang', 'basepath', 'datapath', 'hot_load', 'datafile_names', 'default_sources', 'sources_args', 'remote_sources', 'layout']
 
         # check if a path was provided
         conf_args = self.from_json(path) if path else {}
@@ -36,13 +36,178 @@ in debug mode:
 """
 import abc
 import os
+import sys
 import glob
+import pathlib
+import sqlite3
+import json
+import hashlib
 import inspect
+import shutil
+import tempfile
+import time
+import weakref
+import warnings
+import threading
+import asyncio
+from functools import partial
+from contextlib import closing
+from concurrent.futures import Executor, ThreadPoolExecutor, Future, wait as wait_futures
+import numpy as np
 import xarray as xr
 import pandas as pd
+from collections import OrderedDict
 from collections.abc import Mapping
-from typing import Type, List
+from urllib.parse import urlparse
+from typing import Type, List, Callable, Union, Dict
 
+from ruins.core import shared
+from ruins.core import aggregates
+from ruins.core import download
+from ruins.core import database
+from ruins.core.cache import default_cache_dir
+
+
+# serializes eager netCDF reads across threads
+NETCDF_LOCK = threading.RLock()
+
+
+def data_nbytes(data, loaded_only: bool = True) -> int:
+    """
+    Estimate the in-memory size of a loaded dataset in bytes.
+    For xarray datasets, only variables already loaded into memory are
+    counted, lazy variables still on disk are not, unless ``loaded_only=False``.
+    """
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    elif isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True))
+    elif isinstance(data, xr.DataArray):
+        return data_nbytes(data.to_dataset(name=data.name or '__data__'), loaded_only=loaded_only)
+    elif isinstance(data, xr.Dataset):
+        return int(sum(v.nbytes for v in data.variables.values() if v._in_memory or not loaded_only))
+    else:
+        return sys.getsizeof(data)
+
+
+def downcast(data, dtype: str = 'float32'):
+    """
+    Downcast all floating point data variables of a Dataset, or columns
+    of a DataFrame, with a higher precision than dtype. Coordinates and
+    indices are not changed.
+    """
+    dtype = np.dtype(dtype)
+    needs_cast = lambda t: isinstance(t, np.dtype) and t.kind == 'f' and t.itemsize > dtype.itemsize
+
+    if isinstance(data, xr.Dataset):
+        cast = {name: var.astype(dtype) for name, var in data.data_vars.items() if needs_cast(var.dtype)}
+        return data.assign(cast) if len(cast) > 0 else data
+    elif isinstance(data, xr.DataArray):
+        return data.astype(dtype) if needs_cast(data.dtype) else data
+    elif isinstance(data, pd.DataFrame):
+        cast = {col: dtype for col, t in data.dtypes.items() if needs_cast(t)}
+        return data.astype(cast) if len(cast) > 0 else data
+    else:
+        return data
+
+
+def read_only(data):
+    """
+    Mark the in-memory numpy buffers of a Dataset, DataArray, DataFrame or
+    Series as not writeable, thus in-place assignments to the cached data
+    raise an error. Lazy variables, indices and extension arrays, like
+    categoricals, are not changed. Returns data.
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        # the blocks of the frame, views of them have to be copied before writing
+        for arr in data._mgr.arrays:
+            if isinstance(arr, np.ndarray):
+                arr.flags.writeable = False
+        return data
+    elif isinstance(data, xr.DataArray):
+        variables = [data.variable] + [coord.variable for coord in data.coords.values()]
+    elif isinstance(data, xr.Dataset):
+        variables = data.variables.values()
+    else:
+        return data
+    
+    for var in variables:
+        if not isinstance(var, xr.IndexVariable) and isinstance(var.data, np.ndarray):
+            var.data.flags.writeable = False
+    return data
+
+
+def view(data):
+    """
+    Return a shallow copy of data, which shares the buffers with data.
+    Adding, dropping or renaming variables and columns of the view does not
+    change data. In-place assignments to buffers marked by :func:`read_only`
+    raise an error, with the copy-on-write of pandas 3 the DataFrame view is
+    copied instead.
+    """
+    if isinstance(data, (xr.Dataset, xr.DataArray, pd.DataFrame, pd.Series)):
+        return data.copy(deep=False)
+    return data
+
+
+def _query_key(query) -> str:
+    """Build a hashable key from filter arguments, independent of dict order"""
+    if isinstance(query, dict):
+        return '{' + ','.join(f'{k!r}:{_query_key(v)}' for k, v in sorted(query.items(), key=lambda i: str(i[0])) if v is not None) + '}'
+    elif isinstance(query, (list, tuple, set)):
+        items = sorted(query, key=str) if isinstance(query, set) else query
+        return f'{type(query).__name__}(' + ','.join(_query_key(v) for v in items) + ')'
+    else:
+        return repr(query)
+
+
+def _as_list(value) -> list:
+    """Wrap single values into a list"""
+    if value is None:
+        return []
+    return [value] if isinstance(value, (str, int)) else list(value)
+
+
+def _filter_frame(df: pd.DataFrame, columns: List[str] = None, attrs: dict = None, time: slice = None) -> pd.DataFrame:
+    """Apply the table filter of :func:`CSVSource._filter <ruins.core.data_manager.CSVSource._filter>` in memory"""
+    for col, value in (attrs if attrs is not None else {}).items():
+        mask = df[col].isin(value) if isinstance(value, (list, tuple, set)) else df[col] == value
+        df = df.loc[mask]
+    if time is not None:
+        df = df.loc[time]
+    return df[columns] if columns is not None and len(columns) > 0 else df
+
+
+def file_stamp(path: str) -> tuple:
+    """
+    Cheap fingerprint of a file as tuple of modification time (ns) and size.
+    For folders, like Zarr stores, the latest modification time and the
+    total size of all contained files is used.
+    """
+    if os.path.isdir(path):
+        stats = [os.stat(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files]
+        return (max([s.st_mtime_ns for s in stats], default=0), sum(s.st_size for s in stats))
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def content_hash(path: str, blocksize: int = 2**20) -> str:
+    """
+    SHA-256 hash of the content of a file. For folders, like Zarr stores,
+    the hash is built from the relative paths, sizes and modification times
+    of all contained files.
+    """
+    h = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, _, files in sorted(os.walk(path)):
+            for fname in sorted(files):
+                stat = os.stat(os.path.join(root, fname))
+                h.update(f'{os.path.relpath(os.path.join(root, fname), path)};{stat.st_size};{stat.st_mtime_ns}'.encode())
+    else:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(blocksize), b''):
+                h.update(block)
+    return h.hexdigest()
 
 
 class DataSource(abc.ABC):
@@ -53,6 +218,28 @@ class DataSource(abc.ABC):
     def __init__(self, **kwargs):
         self._kwargs = kwargs
 
+    @property
+    def is_loaded(self) -> bool:
+        """True if the source is currently cached in memory"""
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory size of the cached data in bytes"""
+        return 0
+
+    @property
+    def version(self) -> Union[str, None]:
+        """
+        Cheap token, which changes whenever the data of the source changes.
+        Used to invalidate memoized results. None if the source can't tell.
+        """
+        return None
+
+    def evict(self) -> None:
+        """Drop the cached data, if any."""
+        pass
+
     @abc.abstractmethod
     def read(self):
         pass
@@ -61,91 +248,1034 @@ class DataSource(abc.ABC):
     def filter(self, **kwargs):
         pass
 
+    async def aread(self, executor: Executor = None):
+        """
+        Coroutine version of :func:`read`. The blocking read is run in
+        executor, defaulting to the default executor of the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.read)
+
+    async def afilter(self, executor: Executor = None, **kwargs):
+        """Coroutine version of :func:`filter`, see :func:`aread`"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(self.filter, **kwargs))
+
 
 class FileSource(DataSource, abc.ABC):
     """
     Abstract base class for file sources. This provides the common interface
     for every data source that is based on a file.
+
+    If ``columnar=True``, a compressed, chunked columnar copy of the source is
+    written on first read and later reads are served from that copy. The
+    copies are stored into ``columnar_dir``, which defaults to a hidden
+    ``.columnar`` folder next to the file. Subclasses set the format of the
+    copy by overwriting :attr:`columnar_format` and the two methods
+    :func:`_write_columnar` and :func:`_load_columnar`.
+
+    Cached sources check the modification time and size of the file at most
+    every ``check_interval`` seconds on read. If the file changed, it is
+    reloaded in a background thread and swapped in once fully loaded. Until
+    then, readers are served the old data. Set ``check_interval=None`` to
+    disable the checks.
+
+    If ``shared=True``, the numeric arrays of the loaded data are backed by
+    memory-mapped files in ``share_dir``, which are shared by all processes
+    reading the same file. See :mod:`ruins.core.shared`. The shared data is
+    read-only.
+
+    The dtype policy of a source is set by ``downcast``. If set, like
+    ``downcast='float32'``, all floating point variables with a higher
+    precision are downcasted on load.
     """
-    def __init__(self, path: str, cache: bool = True, hot_load = False, **kwargs):
+    columnar_format = None
+
+    # sources of higher precedence replace sources of the same name
+    precedence = 0
+
+    def __init__(self, path: str, cache: bool = True, hot_load = False, columnar: bool = False, columnar_dir: str = None, filter_cache_size: int = 8, check_interval: float = 2.0, shared: bool = False, share_dir: str = None, downcast: str = None, **kwargs):
         super().__init__(**kwargs)
         self.path = path
         self.cache = cache
+        self.downcast = downcast
+        self.shared = shared
+        self.share_dir = share_dir
+        self._share_folder: str = None
+        self.columnar = columnar and self.columnar_format is not None
+        self.columnar_dir = columnar_dir
+
+        # small cache of the last filter results
+        self.filter_cache_size = filter_cache_size
+        self._filter_cache = OrderedDict()
+        self._generation = 0
+
+        # staleness checks
+        self.check_interval = check_interval
+        self._stamp = None
+        self._last_check = time.monotonic()
+        self._reload_lock = threading.Lock()
+        self._reload_thread: threading.Thread = None
+
+        # callback for cached reads, receives the source and if the read was a cache hit
+        # can also be a weakref.WeakMethod to the callback
+        self.on_access: Callable[['FileSource', bool], None] = None
+
+        # single-flight loading, concurrent readers wait for the running load
+        self._load_lock = threading.Lock()
+        self._inflight: Future = None
+
+        # telemetry
+        self._stats = dict(loads=0, load_time=None, total_load_time=0.0, bytes_read=0, reads=0, hits=0, misses=0, deduplicated=0, filters=0, last_access=None, nbytes_raw=None, nbytes_cast=None)
+        self._stats_lock = threading.Lock()
         
         # check if the dataset should be pre-loaded
         if hot_load:
             self.cache = True
-            self.data = self._load_source()
+            self.data, self._stamp = self._load_stamped()
 
     @abc.abstractmethod
     def _load_source(self):
         """Method to load the actual source on the disk"""
         pass
 
-    def read(self):
+    @property
+    def columnar_path(self) -> str:
+        """Location of the columnar copy of this source"""
+        folder = self.columnar_dir if self.columnar_dir is not None else os.path.join(os.path.dirname(self.path), '.columnar')
+        basename = os.path.basename(self.path).split('.')[0]
+        return os.path.join(folder, f'{basename}.{self.columnar_format}')
+
+    def _write_columnar(self, data, path: str) -> None:
+        """Write the loaded data as columnar copy to path"""
+        raise NotImplementedError
+
+    def _load_columnar(self, path: str):
+        """Load the columnar copy from path"""
+        raise NotImplementedError
+
+    def _load(self):
+        """
+        Load the source and apply the dtype policy. The in-memory size before
+        and after the policy is recorded in the telemetry.
+        """
+        data = self._load_raw()
+        if self.downcast is None:
+            return data
+        
+        before = data_nbytes(data, loaded_only=False)
+        data = downcast(data, self.downcast)
+        with self._stats_lock:
+            self._stats['nbytes_raw'] = before
+            self._stats['nbytes_cast'] = data_nbytes(data, loaded_only=False)
+        return data
+
+    def _load_raw(self):
+        """
+        Load the source. If enabled, the columnar copy is used, as long as it
+        is not older than the source file. Otherwise the copy is (re-)created.
+        """
+        if not self.columnar:
+            self._count_bytes(self.path)
+            return self._load_source()
+
+        cpath = self.columnar_path
+        if os.path.exists(cpath) and os.path.getmtime(cpath) >= os.path.getmtime(self.path):
+            self._count_bytes(cpath)
+            return self._load_columnar(cpath)
+
+        # parse the original file and convert it
+        self._count_bytes(self.path)
+        data = self._load_source()
+        self._atomic_write(lambda tmp: self._write_columnar(data, tmp), cpath)
+        
+        return data
+
+    def _atomic_write(self, write: Callable[[str], None], path: str) -> bool:
+        """
+        Call write with a temporary path and move the result to path, to never
+        serve half-written copies. Errors are only warned, as the copies are
+        optional. Returns True on success.
+        """
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            write(tmp)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(tmp, path)
+            return True
+        except Exception as e:
+            warnings.warn(f"Could not write a copy of {self.path} to {path}: {e}")
+            return False
+
+    def _count_bytes(self, path: str) -> None:
+        """Add the size of a file read from disk to the telemetry"""
+        try:
+            size = file_stamp(path)[1]
+        except OSError:
+            return
+        with self._stats_lock:
+            self._stats['bytes_read'] += size
+
+    def _timed_load(self, load: Callable):
+        """Call load and record the wall time in the telemetry"""
+        t1 = time.perf_counter()
+        data = load()
+        elapsed = time.perf_counter() - t1
+        with self._stats_lock:
+            self._stats['loads'] += 1
+            self._stats['load_time'] = elapsed
+            self._stats['total_load_time'] += elapsed
+        return data
+
+    def _load_stamped(self) -> tuple:
+        """Load the source and return it along with the file stamp before loading"""
+        try:
+            stamp = file_stamp(self.path)
+        except OSError:
+            stamp = None
+        self._last_check = time.monotonic()
+
+        if self.shared and stamp is not None:
+            return self._timed_load(lambda: self._load_shared(stamp)), stamp
+        return read_only(self._timed_load(self._load)), stamp
+
+    def _record_access(self, hit: bool) -> None:
+        with self._stats_lock:
+            self._stats['reads'] += 1
+            self._stats['hits' if hit else 'misses'] += 1
+            self._stats['last_access'] = time.time()
+
+    @property
+    def stats(self) -> dict:
+        """
+        Telemetry of this source: number of loads, wall time of the last and
+        all loads in seconds, bytes read from disk, in-memory size in bytes,
+        number of reads, cache hits and misses, reads which waited for a
+        concurrent load (``deduplicated``), filter calls and the unix
+        timestamp of the last access. For sources with a dtype policy, the
+        size of the data before (``nbytes_raw``) and after (``nbytes_cast``)
+        the policy is included.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['nbytes'] = self.nbytes
+        return stats
+
+    def _load_shared(self, stamp: tuple):
+        """Attach to the shared copy of the source and release the previous one"""
+        try:
+            data, folder = shared.attach(self.path, stamp, self._load, share_dir=self.share_dir)
+        except (OSError, TypeError) as e:
+            warnings.warn(f"Could not share {self.path}, loading a private copy: {e}")
+            return self._load()
+
+        self._release_shared()
+        self._share_folder = folder
+        return data
+
+    def _release_shared(self) -> None:
+        if self._share_folder is not None:
+            shared.release(self._share_folder)
+            self._share_folder = None
+
+    def is_stale(self) -> bool:
+        """
+        True if the file changed on disk since the cached data was loaded.
+        Missing files are never stale, the cached data is kept.
+        """
+        self._last_check = time.monotonic()
+        if not hasattr(self, 'data') or self._stamp is None:
+            return False
+        try:
+            return file_stamp(self.path) != self._stamp
+        except OSError:
+            return False
+
+    @property
+    def is_reloading(self) -> bool:
+        """True if a background reload is running"""
+        thread = self._reload_thread
+        return thread is not None and thread.is_alive()
+
+    def _reload(self) -> None:
+        try:
+            data, stamp = self._load_stamped()
+        except Exception as e:
+            warnings.warn(f"Could not reload {self.path}: {e}")
+            return
+        
+        self._swap(data, stamp)
+
+    def _swap(self, data, stamp: tuple) -> None:
+        """Swap in new data - readers either get the old or the new dataset"""
+        self.data = read_only(data)
+        self._stamp = stamp
+        self._last_check = time.monotonic()
+        self._generation += 1
+        self._filter_cache = OrderedDict()
+
+    def refresh(self, wait: bool = False) -> None:
+        """
+        Reload the source in a background thread and swap in the new data
+        once it is completely loaded. Does nothing if a reload is already
+        running. If ``wait=True``, block until the reload has finished.
+        """
+        with self._reload_lock:
+            if not self.is_reloading:
+                self._reload_thread = threading.Thread(target=self._reload, name=f'ruins-reload-{os.path.basename(self.path)}', daemon=True)
+                self._reload_thread.start()
+            thread = self._reload_thread
+        
+        if wait:
+            thread.join()
+
+    def _check_stale(self) -> None:
+        """Throttled staleness check, triggers a background reload if needed"""
+        if self.check_interval is None or time.monotonic() - self._last_check < self.check_interval:
+            return
+        if self.is_stale():
+            self.refresh()
+
+    @property
+    def is_loaded(self) -> bool:
+        """True if the source is currently cached in memory"""
+        return hasattr(self, 'data')
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory size of the cached data in bytes"""
+        data = getattr(self, 'data', None)
+        return data_nbytes(data) if data is not None else 0
+
+    @property
+    def version(self) -> Union[str, None]:
+        """
+        Modification time and size of the file, as ``'<mtime_ns>-<size>'``.
+        For cached sources, this is the stamp of the served data, which
+        only changes once a reload has been swapped in.
+        """
+        stamp = self._stamp if hasattr(self, 'data') else None
+        if stamp is None:
+            try:
+                stamp = file_stamp(self.path)
+            except OSError:
+                return None
+        return f'{stamp[0]}-{stamp[1]}'
+
+    def evict(self) -> None:
+        """Drop the cached data. The next read will load the source again."""
+        if hasattr(self, 'data'):
+            del self.data
+        self._filter_cache.clear()
+        self._release_shared()
+
+    def read(self, copy: bool = False):
+        """
+        Return the data of the source. Cached data is returned as a view,
+        see :func:`view <ruins.core.data_manager.view>`: the numerical
+        buffers are shared with the cache and read-only, while variables
+        and columns can be added or dropped. Pass ``copy=True`` for a
+        writeable deep copy.
+        """
         if self.cache:
-            if not hasattr(self, 'data'):
-                self.data = self._load_source()
-            return self.data
+            data = getattr(self, 'data', None)
+            hit = data is not None
+            if not hit:
+                data = self._load_once()
+            else:
+                self._check_stale()
+            self._record_access(hit)
+
+            callback = self.on_access() if isinstance(self.on_access, weakref.WeakMethod) else self.on_access
+            if callback is not None:
+                callback(self, hit)
+            return data.copy(deep=True) if copy else view(data)
 
         else:
-            return self._load_source()
-    
-    def filter(self):
-        pass
+            self._record_access(False)
+            return self._timed_load(self._load)
+
+    def _load_once(self):
+        """
+        Load the source into the cache. Only one load runs at a time, all
+        concurrent callers wait for its result, or its error. The waiting
+        callers are counted as ``deduplicated`` loads in the telemetry.
+        """
+        with self._load_lock:
+            data = getattr(self, 'data', None)
+            if data is not None:
+                return data
+            leader = self._inflight is None
+            if leader:
+                self._inflight = Future()
+            future = self._inflight
+
+        if not leader:
+            with self._stats_lock:
+                self._stats['deduplicated'] += 1
+            return future.result()
+
+        try:
+            self.data, self._stamp = self._load_stamped()
+            future.set_result(self.data)
+            return future.result()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._load_lock:
+                self._inflight = None
+
+    def _filter(self, **kwargs):
+        """
+        Method to apply the filter to the source. Has to be overwritten by
+        sources supporting filters. The default implementation can only
+        return the whole dataset.
+        """
+        if any(v is not None for v in kwargs.values()):
+            raise NotImplementedError(f"{self.__class__.__name__} does not support filters.")
+        return self.read()
+
+    def filter(self, **kwargs):
+        """
+        Return a subset of the source. The filter is pushed down into the
+        reader of the source, wherever possible, to only load the requested
+        slice. The supported keyword arguments depend on the source type.
+        The results of the last ``filter_cache_size`` queries are cached.
+        """
+        with self._stats_lock:
+            self._stats['filters'] += 1
+            self._stats['last_access'] = time.time()
+
+        key = _query_key(kwargs)
+        cache = self._filter_cache
+        if key in cache:
+            self._check_stale()
+            cache.move_to_end(key)
+            return view(cache[key])
+
+        generation = self._generation
+        result = self._filter(**kwargs)
+
+        # cache the result - unless the data was swapped in the meantime
+        if self.filter_cache_size > 0 and generation == self._generation:
+            cache[key] = read_only(result)
+            while len(cache) > self.filter_cache_size:
+                cache.popitem(last=False)
+            return view(result)
+        
+        return result
 
 
 class HDF5Source(FileSource):
     """
     HDF5 file sources. This class is used to load HDF5 files.
+
+    The source can be opened eagerly (default) or lazily. In lazy mode, the
+    file is opened as a dask-backed dataset, chunked as given by ``chunks``.
+    Selections and reductions then stay lazy and only the touched chunks are
+    loaded into memory. Both settings can be set per source via
+    ``Config.sources_args``:
+
+    .. code-block:: python
+
+        sources_args = {
+            'weather.nc': dict(lazy=True, chunks={'time': 3650})
+        }
+
+    Parameters
+    ----------
+    lazy : bool
+        If True, the dataset is opened dask-backed. Falls back to eager mode,
+        if dask is not installed.
+    chunks : dict
+        Chunk sizes by dimension name, passed to :func:`xarray.open_dataset`.
+        Defaults to the chunking of the file on disk.
+
     """
+    def __init__(self, lazy: bool = False, chunks: dict = None, **kwargs):
+        self.lazy = lazy
+        self.chunks = chunks if chunks is not None else {}
+
+        # lazy mode needs dask
+        if self.lazy:
+            try:
+                import dask
+            except ModuleNotFoundError:
+                warnings.warn(f"dask is not installed. {kwargs.get('path')} will be opened eagerly.")
+                self.lazy = False
+
+        # lazy datasets are not loaded into memory, there is nothing to share
+        if self.lazy:
+            kwargs['shared'] = False
+
+        super(HDF5Source, self).__init__(**kwargs)
+
+    columnar_format = 'zarr'
+
     def _load_source(self) -> xr.Dataset:
+        if self.lazy:
+            return xr.open_dataset(self.path, chunks=self.chunks)
+        
+        # eager sources are read completely and the file is closed right away
+        return xr.load_dataset(self.path)
+
+    def _load(self) -> xr.Dataset:
+        # the netCDF library is not thread-safe, eager loads of concurrent warm-ups have to wait
+        if self.lazy:
+            return super(HDF5Source, self)._load()
+        with NETCDF_LOCK:
+            return super(HDF5Source, self)._load()
+
+    def _open_source(self) -> xr.Dataset:
+        """Open the file without loading any data"""
         return xr.open_dataset(self.path)
+
+    def _filter(self, station=None, vars=None, time=None, attrs: dict = None, columns: List[str] = None, **sel) -> Union[xr.Dataset, xr.DataArray]:
+        """
+        Select a subset of the dataset, before it is loaded from disk.
+        If the source is not cached yet, only the selection is read from
+        the file and the source stays unloaded.
+
+        Parameters
+        ----------
+        station : str, List[str]
+            Data variable(s) to select. If a single name is given, a
+            DataArray is returned, a Dataset otherwise.
+        vars : str, List[str]
+            Values of the ``vars`` dimension to select
+        time : slice
+            Time range to select
+        attrs : dict
+            Select only data variables with matching attributes, ie.
+            ``attrs={'RCP': 'rcp45'}``
+        columns : List[str]
+            Alias for a list of stations
+        sel : dict
+            Any other selection passed to :func:`xarray.Dataset.sel`
+
+        """
+        args = dict(station=station, vars=vars, time=time, attrs=attrs, columns=columns, **sel)
+        if self.lazy or self.columnar or self.is_loaded:
+            data = self._select(self.read(), **args)
+
+            # load the subset, unless this is a lazy source
+            return data if self.lazy else data.load()
+
+        # read only the selection from the file
+        with NETCDF_LOCK:
+            with self._open_source() as ds:
+                data = self._select(ds, **args).load()
+        if self.downcast is not None:
+            data = downcast(data, self.downcast)
+        with self._stats_lock:
+            self._stats['bytes_read'] += data_nbytes(data)
+        return data
+
+    def _select(self, data: xr.Dataset, station=None, vars=None, time=None, attrs: dict = None, columns: List[str] = None, **sel) -> Union[xr.Dataset, xr.DataArray]:
+        """Apply the selection of :func:`_filter` to data"""
+        # filter the data variables
+        if attrs is not None:
+            data = data.filter_by_attrs(**attrs)
+        names = _as_list(station) + _as_list(columns)
+        if len(names) > 0:
+            data = data[station] if isinstance(station, str) and columns is None else data[names]
+        
+        # select along dimensions
+        if vars is not None:
+            sel['vars'] = vars
+        if time is not None:
+            sel['time'] = time
+        if len(sel) > 0:
+            data = data.sel(**sel)
+        return data
+
+    def _write_columnar(self, data: xr.Dataset, path: str) -> None:
+        data.to_zarr(path, mode='w')
+
+    def _load_columnar(self, path: str) -> xr.Dataset:
+        return xr.open_dataset(path, engine='zarr', chunks=self.chunks if self.lazy else None)
     
-    def read(self) -> xr.Dataset:
-        return super(HDF5Source, self).read()
+    def read(self, copy: bool = False) -> xr.Dataset:
+        return super(HDF5Source, self).read(copy=copy)
 
 
-class CSVSource(FileSource):
+class ZarrSource(HDF5Source):
     """
-    CSV file source. This class is used to load CSV files.
+    Zarr store source. This class is used to load chunked, compressed Zarr
+    stores. Lazy mode and chunking work just like for 
+    :class:`HDF5Source <ruins.core.data_manager.HDF5Source>`.
+    """
+    columnar_format = None
+
+    def _load_source(self) -> xr.Dataset:
+        return self._load_columnar(self.path)
+
+    def _open_source(self) -> xr.Dataset:
+        return xr.open_dataset(self.path, engine='zarr', chunks=None)
+
+
+class ParquetSource(FileSource):
+    """
+    Parquet file source. This class is used to load Parquet files.
     """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        # inspect read_csv to learn about allowed param
-        sig = inspect.signature(pd.read_csv)
+        # inspect read_parquet to learn about allowed params
+        sig = inspect.signature(pd.read_parquet)
         self.pandas_params = list(sig.parameters.keys())
 
-    def _load_source(self):
+    def _load_source(self) -> pd.DataFrame:
         # extract pandas args
         pandas_args = {k: v for k, v in self._kwargs.items() if k in self.pandas_params}
 
         # load data
-        return pd.read_csv(self.path, **pandas_args)
+        return pd.read_parquet(self.path, **pandas_args)
 
 
-class DATSource(FileSource):
+class CSVSource(FileSource):
     """
-    DAT file source. This class is used to load .dat files
+    CSV file source. This class is used to load CSV files.
+
+    The schema of the table can be set per source via ``Config.sources_args``.
+    Besides the arguments of :func:`pandas.read_csv`, like ``dtype`` and
+    ``parse_dates``, a list of ``categorical`` columns can be given.
+    With ``engine='pyarrow'`` the multi-threaded pyarrow parser is used,
+    if installed and if it supports the given arguments. Otherwise, the
+    default parser is used.
+
+    .. code-block:: python
+
+        sources_args = {
+            'simulation.csv': dict(index_col=0, dtype={'value': 'float32'}, categorical=['RCP', 'GCM'], engine='pyarrow')
+        }
+
+    Parsed tables are written to a Feather side-cache in ``columnar_dir``,
+    keyed by modification time and size of the file. Later loads read
+    the side-cache instead of parsing the file. Set ``side_cache=False``
+    to disable it. If ``columnar=True``, the Parquet copy is used instead.
     """
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+    columnar_format = 'parquet'
 
-        # inspect read_csv to learn about allowed params
+    def __init__(self, engine: str = None, categorical: List[str] = None, side_cache: bool = True, **kwargs):
+        # inspect read_csv to learn about allowed param
         sig = inspect.signature(pd.read_csv)
-        self.pandas_params = list(sig.parameters.keys())
+        self.pandas_params = [p for p in sig.parameters.keys() if p != 'engine']
+
+        self.engine = engine
+        self.categorical = _as_list(categorical)
+        self.side_cache = side_cache
+
+        # the side-cache needs pyarrow
+        if self.side_cache:
+            try:
+                import pyarrow
+            except ModuleNotFoundError:
+                self.side_cache = False
+
+        super().__init__(**kwargs)
+
+    def _pandas_args(self) -> dict:
+        """extract pandas args"""
+        return {k: v for k, v in self._kwargs.items() if k in self.pandas_params}
+
+    def _apply_schema(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Convert the categorical columns"""
+        for col in self.categorical:
+            if col in data.columns:
+                data[col] = data[col].astype('category')
+        return data
+
+    def _read_csv(self, **pandas_args) -> pd.DataFrame:
+        """Parse the file, using the configured engine if possible"""
+        if self.engine is not None:
+            try:
+                return pd.read_csv(self.path, engine=self.engine, **pandas_args)
+            except (ValueError, ImportError) as e:
+                warnings.warn(f"Can't parse {self.path} with engine='{self.engine}', using the default parser: {e}")
+                self.engine = None
+        return pd.read_csv(self.path, **pandas_args)
 
     def _load_source(self):
-        # extract pandas args
-        pandas_args = {k: v for k, v in self._kwargs.items() if k in self.pandas_params}
+        # load data
+        return self._apply_schema(self._read_csv(**self._pandas_args()))
+
+    @property
+    def side_cache_path(self) -> Union[str, None]:
+        """Location of the Feather side-cache for the current file, None if the file is missing"""
+        try:
+            mtime, size = file_stamp(self.path)
+        except OSError:
+            return None
+        folder = self.columnar_dir if self.columnar_dir is not None else os.path.join(os.path.dirname(self.path), '.columnar')
+        basename = os.path.basename(self.path).split('.')[0]
+        return os.path.join(folder, f'{basename}.{mtime}-{size}.feather')
+
+    def _load_raw(self):
+        if self.columnar or not self.side_cache:
+            return super()._load_raw()
+        
+        cpath = self.side_cache_path
+        if cpath is not None and os.path.exists(cpath):
+            self._count_bytes(cpath)
+            return self._read_side_cache(cpath)
+        
+        # parse the file and write the side-cache
+        self._count_bytes(self.path)
+        data = self._load_source()
+        if cpath is not None and self._atomic_write(data.to_feather, cpath):
+            # remove side-caches of older versions
+            prefix = os.path.basename(self.path).split('.')[0] + '.'
+            for old in glob.glob(os.path.join(os.path.dirname(cpath), f'{glob.escape(prefix)}*.feather')):
+                if old != cpath and os.path.basename(old)[len(prefix):].split('.')[0].replace('-', '').isdigit():
+                    os.remove(old)
+        
+        return data
+
+    def _read_side_cache(self, path: str, columns: List[str] = None) -> pd.DataFrame:
+        """Read the side-cache. If columns are given, only these and the index are read."""
+        if columns is None:
+            return pd.read_feather(path)
+        
+        import pyarrow
+        with pyarrow.memory_map(path) as f:
+            meta = pyarrow.ipc.open_file(f).schema.pandas_metadata or {}
+        index = [c for c in meta.get('index_columns', []) if isinstance(c, str)]
+        return pd.read_feather(path, columns=index + [c for c in columns if c not in index])
+
+    def _write_columnar(self, data: pd.DataFrame, path: str) -> None:
+        data.to_parquet(path, compression='zstd')
+
+    def _load_columnar(self, path: str) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+    def _read_subset(self, columns: List[str], chunksize: int = 100000):
+        """
+        Read only the needed columns from the file. The chunks are returned
+        as a generator, to filter the rows before concatenating.
+        """
+        pandas_args = self._pandas_args()
+        index_col = pandas_args.pop('index_col', None)
+        parse_dates = pandas_args.pop('parse_dates', None)
+        for arg in ('usecols', 'nrows', 'chunksize', 'iterator'):
+            pandas_args.pop(arg, None)
+        
+        # read the header to translate names to positions
+        header = pd.read_csv(self.path, nrows=0, **{k: v for k, v in pandas_args.items() if k not in ('dtype', 'converters')}).columns.tolist()
+        position = lambda c: c if isinstance(c, int) else header.index(c)
+        index_pos = [position(c) for c in _as_list(index_col)]
+        usecols = sorted(set(index_pos + [position(c) for c in columns]))
+        
+        # positions of index_col and parse_dates are relative to usecols
+        if index_col is not None:
+            new_index = [usecols.index(p) for p in index_pos]
+            pandas_args['index_col'] = new_index if isinstance(index_col, (list, tuple)) else new_index[0]
+        if isinstance(parse_dates, (list, tuple)):
+            pandas_args['parse_dates'] = [usecols.index(position(c)) for c in parse_dates if position(c) in usecols]
+        elif parse_dates is not None:
+            pandas_args['parse_dates'] = parse_dates
+
+        return pd.read_csv(self.path, usecols=usecols, chunksize=chunksize, **pandas_args)
+
+    def _filter(self, columns: List[str] = None, attrs: dict = None, time: slice = None) -> pd.DataFrame:
+        """
+        Select a subset of the table. If the source is not loaded yet, only
+        the needed columns are read from the file and the rows are filtered
+        chunk-wise.
+
+        Parameters
+        ----------
+        columns : List[str]
+            The columns to return. Defaults to all columns
+        attrs : dict
+            Column values to filter the rows. Lists are matched against 
+            any of the values, ie. ``attrs={'RCP': ['rcp45', 'rcp85']}``
+        time : slice
+            Slice of the row index, for tables indexed by time.
+
+        """
+        attrs = attrs if attrs is not None else {}
+        columns = _as_list(columns)
+        apply = partial(_filter_frame, columns=columns, attrs=attrs, time=time)
+
+        # filter in memory if the source is cached, or all columns are needed anyway
+        if self.is_loaded or self.columnar or len(columns) == 0:
+            return apply(self.read())
+
+        # read only the needed columns from the side-cache
+        needed = list(dict.fromkeys(columns + list(attrs.keys())))
+        cpath = self.side_cache_path if self.side_cache else None
+        if cpath is not None and os.path.exists(cpath):
+            return apply(self._read_side_cache(cpath, columns=needed))
+
+        # filter chunk-wise
+        chunks = self._read_subset(columns=needed)
+        return self._apply_schema(pd.concat([apply(chunk) for chunk in chunks]))
+
+
+class DATSource(CSVSource):
+    """
+    DAT file source. This class is used to load .dat files
+    """
+    def _pandas_args(self) -> dict:
+        pandas_args = super(DATSource, self)._pandas_args()
 
         # set the separator to \s+ as usually used for .dat
         if 'sep' not in pandas_args:
-            pandas_args['sep'] = '\s+'
+            pandas_args['sep'] = r'\s+'
         
-        # load data
-        return pd.read_csv(self.path, **pandas_args)
+        return pandas_args
+
+
+class DatabaseSource(FileSource):
+    """
+    SQLite database source. This class is used to load tables imported by
+    :mod:`ruins.core.database`.
+
+    The table of the same name as the file is read, unless another ``table``
+    is given. The index and the column types are restored from the metadata
+    of the import. A database takes precedence over other sources of the
+    same name, like the CSV file it was imported from.
+
+    Filters are translated into SQL and run by the database, using the
+    indices created on import. Thus, option lists and subsets of large
+    tables are queried without loading the whole table.
+    """
+    precedence = 1
+
+    def __init__(self, table: str = None, **kwargs):
+        self.table = table if table is not None else os.path.basename(kwargs['path']).split('.')[0]
+        super().__init__(**kwargs)
+
+    def _connect(self) -> sqlite3.Connection:
+        # read-only, one connection per query, thus safe across threads
+        uri = pathlib.Path(os.path.abspath(self.path)).as_uri() + '?mode=ro'
+        return sqlite3.connect(uri, uri=True)
+
+    def _query(self, columns: List[str] = None, attrs: dict = None, time: slice = None) -> pd.DataFrame:
+        with closing(self._connect()) as con:
+            meta = database.read_meta(con, self.table)
+            sql, params = database.build_query(self.table, meta, columns=columns, attrs=attrs, time=time)
+            df = pd.read_sql_query(sql, con, params=params)
+        return database.restore(df, meta)
+
+    def _load_source(self) -> pd.DataFrame:
+        return self._query()
+
+    def _filter(self, columns: List[str] = None, attrs: dict = None, time: slice = None) -> pd.DataFrame:
+        """
+        Select a subset of the table. If the source is not loaded, the
+        filter is run as SQL query. The index is always returned.
+
+        Parameters
+        ----------
+        columns : List[str]
+            The columns to return. Defaults to all columns
+        attrs : dict
+            Column values to filter the rows. Lists are matched against 
+            any of the values, ie. ``attrs={'RCP': ['rcp45', 'rcp85']}``
+        time : slice
+            Slice of the time index. Partial date strings include the
+            whole period, like ``slice('2000', '2001')``.
+
+        """
+        columns = _as_list(columns)
+        if self.is_loaded:
+            return _filter_frame(self.read(), columns=columns, attrs=attrs, time=time)
+        
+        df = self._query(columns=columns, attrs=attrs, time=time)
+        return df[columns] if len(columns) > 0 else df
+
+
+class HTTPSource(DataSource):
+    """
+    Remote source, fetched via HTTP(S) on its first read.
+
+    The file at ``url`` is downloaded into ``cache_dir`` and read by a file
+    source, like :class:`HDF5Source <ruins.core.data_manager.HDF5Source>`
+    for ``.nc`` files. All other keyword arguments are passed to that
+    reader. The local copy is revalidated with the ``ETag`` and
+    ``Last-Modified`` headers of the last response, at most every
+    ``revalidate_interval`` seconds, and only transferred again if it
+    changed on the server. Large files are fetched with concurrent range
+    requests. See :func:`fetch <ruins.core.download.fetch>`. The
+    :func:`version` is revalidated by a conditional HEAD request, at most
+    every ``check_interval`` seconds.
+
+    Remote sources are configured by name in ``Config.remote_sources``:
+
+    .. code-block:: python
+
+        remote_sources = {
+            'weather': dict(url='https://example.com/data/weather.nc', downcast='float32')
+        }
+
+    If the server can't be reached, the local copy is used, if any.
+
+    Parameters
+    ----------
+    url : str
+        URL of the file
+    cache_dir : str
+        Folder for the local copies
+    reader : str, Type[FileSource]
+        File source class reading the local copy. Defaults to the class
+        for the file extension of the url.
+    revalidate_interval : float
+        Minimum number of seconds between two revalidations. If None,
+        the local copy is only revalidated on the first read.
+    workers : int
+        Maximum number of concurrent range requests
+    range_size : int
+        Minimum size of a range request in bytes
+
+    """
+    readers = {'nc': 'HDF5Source', 'csv': 'CSVSource', 'dat': 'DATSource', 'parquet': 'ParquetSource', 'sqlite': 'DatabaseSource'}
+
+    def __init__(self, url: str, cache_dir: str = None, reader: Union[str, Type[FileSource]] = None, revalidate_interval: float = 600.0, workers: int = 4, range_size: int = 2**23, **kwargs):
+        self.url = url
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(tempfile.gettempdir(), 'ruins-remote')
+        self.revalidate_interval = revalidate_interval
+        self.workers = workers
+        self.range_size = range_size
+        
+        # one folder per url, as different servers might use the same file names
+        fname = os.path.basename(urlparse(url).path)
+        key = hashlib.sha1(url.encode()).hexdigest()[:16]
+        self.path = os.path.join(self.cache_dir, key, fname)
+
+        # resolve the reader
+        if reader is None:
+            reader = self.readers.get(fname.split('.')[-1])
+            if reader is None:
+                raise ValueError(f"Can't infer the reader of {url}. Pass the reader class.")
+        if isinstance(reader, str):
+            reader = globals()[reader]
+        
+        kwargs['hot_load'] = False
+        self.reader: FileSource = reader(path=self.path, **kwargs)
+        super(HTTPSource, self).__init__(**kwargs)
+
+        self._fetch_lock = threading.Lock()
+        self._last_fetch = None
+        self._remote_version = None
+        self._last_check = None
+        self._http_stats = dict(fetches=0, not_modified=0, bytes_downloaded=0, fetch_time=0.0, fetch_errors=0)
+
+    @property
+    def on_access(self):
+        return self.reader.on_access
+
+    @on_access.setter
+    def on_access(self, callback) -> None:
+        # the cache is held by the reader
+        self.reader.on_access = callback
+
+    def revalidate(self, force: bool = False) -> bool:
+        """
+        Download the file, if there is no local copy yet or if it changed
+        on the server. Unless ``force=True``, this is throttled by the
+        ``revalidate_interval``. Returns True if the file was downloaded.
+        """
+        with self._fetch_lock:
+            exists = os.path.exists(self.path)
+            if exists and not force and self._last_fetch is not None:
+                if self.revalidate_interval is None or time.monotonic() - self._last_fetch < self.revalidate_interval:
+                    return False
+            
+            t1 = time.perf_counter()
+            try:
+                changed = download.fetch(self.url, self.path, workers=self.workers, range_size=self.range_size)
+            except OSError as e:
+                self._http_stats['fetch_errors'] += 1
+                if not exists:
+                    raise
+                warnings.warn(f"Could not revalidate {self.url}, using the local copy: {e}")
+                changed = False
+            self._last_fetch = time.monotonic()
+            # the version is checked again, against the new local copy
+            if changed:
+                self._last_check = None
+
+            self._http_stats['fetch_time'] += time.perf_counter() - t1
+            if changed:
+                self._http_stats['fetches'] += 1
+                self._http_stats['bytes_downloaded'] += os.path.getsize(self.path)
+            else:
+                self._http_stats['not_modified'] += 1
+
+        # drop the outdated data
+        if changed:
+            self.reader.evict()
+        return changed
+
+    @property
+    def stats(self) -> dict:
+        """
+        Telemetry of the reader, see :func:`stats <ruins.core.data_manager.FileSource.stats>`,
+        along with the number of downloads, the revalidations answered with
+        ``304 Not Modified``, downloaded bytes, failed requests and the
+        wall time of all requests in seconds.
+        """
+        return dict(**self.reader.stats, **self._http_stats)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.reader.is_loaded
+
+    @property
+    def nbytes(self) -> int:
+        return self.reader.nbytes
+
+    @property
+    def version(self) -> Union[str, None]:
+        """
+        Version of the remote file, built from its ``ETag`` or
+        ``Last-Modified`` header. It is revalidated by a conditional HEAD
+        request, at most every ``check_interval`` seconds of the reader,
+        but the file is not downloaded, this is left to :func:`read` and
+        :func:`filter`. Falls back to the version of the local copy, if the
+        server sends no validators. None if there is no local copy yet.
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        interval = getattr(self.reader, 'check_interval', None)
+        with self._fetch_lock:
+            if self._last_check is None or (interval is not None and time.monotonic() - self._last_check >= interval):
+                try:
+                    validators = download.remote_validators(self.url, self.path)
+                    self._remote_version = validators['etag'] or validators['last_modified']
+                except OSError as e:
+                    warnings.warn(f"Could not revalidate the version of {self.url}: {e}")
+                self._last_check = time.monotonic()
+        
+        return self._remote_version or self.reader.version
+
+    def evict(self) -> None:
+        self.reader.evict()
+
+    def read(self, copy: bool = False):
+        self.revalidate()
+        return self.reader.read(copy=copy)
+
+    def filter(self, **kwargs):
+        self.revalidate()
+        return self.reader.filter(**kwargs)
+
+
+def _watch_sources(ref: weakref.ref, stop: threading.Event, interval: float) -> None:
+    """Loop of the DataManager watcher thread"""
+    while not stop.wait(interval):
+        dm = ref()
+        if dm is None:
+            return
+        dm.check_sources()
+        del dm
 
 
 class DataManager(Mapping):
@@ -168,6 +1298,58 @@ class DataManager(Mapping):
         A dictionary of file extensions and their corresponding DataSource.
         If something is not listed, the DataManager will ignore the file type.
         The include_mimes can be overwritten by passing filenames directly.
+    columnar : bool
+        Will be passed to the DataSource classes. If True, file sources write
+        a columnar copy (Parquet or Zarr) on first read and serve later reads
+        from that copy. Can be overwritten per source in ``sources_args``.
+    columnar_dir : str
+        Folder for the columnar copies. Defaults to a hidden ``.columnar``
+        folder in the datapath.
+    memory_budget : int
+        Soft limit of the in-memory size of all cached sources in bytes. If
+        exceeded, the least recently used sources are evicted and
+        transparently reloaded on their next read. A source is counted from
+        its first read after loading, thus the cached sources can exceed the
+        budget by the size of the source loaded last, until the next read.
+        Defaults to no limit.
+    hot_load_workers : int
+        If set together with ``hot_load=True``, the sources are not loaded
+        one after another on instantiation, but warmed up concurrently by a
+        thread pool of this size in the background. 
+        See :func:`warm_up <ruins.core.data_manager.DataManager.warm_up>`.
+    manifest_path : str
+        Location of the persisted manifest of the datapath. The manifest
+        stores path, size, modification time and content hash of each file
+        and is used to only rebuild changed sources on a rescan. Defaults to
+        a file per datapath in the ``manifests`` folder of the user cache,
+        see :func:`default_cache_dir <ruins.core.cache.default_cache_dir>`,
+        thus the datapath can be read-only. Set to ``False`` to not persist
+        the manifest.
+    check_interval : float
+        Minimum number of seconds between two checks of a cached file for
+        changes on read. Changed files are reloaded in the background.
+        Set to ``None`` to disable the checks.
+    watch_interval : float
+        If set, a background thread checks all loaded sources for changes
+        every ``watch_interval`` seconds. See
+        :func:`start_watcher <ruins.core.data_manager.DataManager.start_watcher>`.
+    io_workers : int
+        Number of threads running the blocking reads of the async API.
+        See :func:`aread_many <ruins.core.data_manager.DataManager.aread_many>`.
+    shared : bool
+        If True, the loaded sources are backed by memory-mapped files, which
+        are shared by all processes on the same host. This avoids one copy
+        of each dataset per streamlit server process. See :mod:`ruins.core.shared`.
+    share_dir : str
+        Folder for the shared files. Defaults to ``/dev/shm/ruins-shared``.
+    remote_cache_dir : str
+        Folder for the local copies of the ``remote_sources`` of the config.
+        Defaults to a hidden ``.remote`` folder in the datapath.
+        See :class:`HTTPSource <ruins.core.data_manager.HTTPSource>`.
+    snapshot_path : str
+        If a snapshot exists at this location, all sources which did not
+        change since the snapshot are restored from it on instantiation.
+        See :func:`snapshot <ruins.core.data_manager.DataManager.snapshot>`.
 
     """
     def __init__(self, datapath: str = None, cache: bool = True, hot_load = False, debug: bool = False, **kwargs) -> None:
@@ -181,17 +1363,220 @@ class DataManager(Mapping):
         else:
             self.from_config(datapath=datapath, cache=cache, hot_load=hot_load, debug=debug, **kwargs)
     
-    def read(self, name_or_file: str):
+    def resolve(self, name_or_file: str) -> str:
+        """Resolve a dataset name from Config.datafile_names to the source name"""
         # if config init then there is an attrribute called datafile_names
         if 'datafile_names' in self._config:
             # if name_or_file exists in Config.datafile_names, the filename stored there is used. Otherwise name_or_file is considered the filename.
-            identifier = self._config['datafile_names'].get(name_or_file, name_or_file) # unittest
+            return self._config['datafile_names'].get(name_or_file, name_or_file) # unittest
+        else:
+            return name_or_file
+
+    def read(self, name_or_file: str, copy: bool = False):
+        """
+        Return the data of a source. Cached data is returned as a read-only
+        view, pass ``copy=True`` to get a writeable copy. See
+        :func:`read <ruins.core.data_manager.FileSource.read>`.
+        """
+        # reads of sources, which are just warming up, wait for the running load
+        return self[self.resolve(name_or_file)].read(copy=copy)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool running the blocking reads of the async API"""
+        with self._lru_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='ruins-io')
+            return self._executor
+
+    async def aread(self, name_or_file: str):
+        """
+        Coroutine version of :func:`read`. Several sources can be read
+        concurrently with :func:`aread_many` or :func:`asyncio.gather`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.read, name_or_file)
+
+    async def afilter(self, name_or_file: str, **kwargs):
+        """Coroutine version of :func:`filter`"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self.filter, name_or_file, **kwargs))
+
+    async def aread_many(self, names: List[str]) -> Dict[str, Union[xr.Dataset, pd.DataFrame]]:
+        """Read all given sources concurrently and return the data by name"""
+        results = await asyncio.gather(*[self.aread(name) for name in names])
+        return dict(zip(names, results))
+
+    def read_many(self, names: List[str]) -> Dict[str, Union[xr.Dataset, pd.DataFrame]]:
+        """
+        Blocking version of :func:`aread_many` for synchronous callers.
+        Returns the data of all given sources by name.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aread_many(names))
+        
+        # called from a running event loop, which can't be blocked by asyncio.run
+        return dict(zip(names, self.executor.map(self.read, names)))
+
+    def _warm_source(self, name: str) -> None:
+        """Load a single source and record the load time"""
+        t1 = time.perf_counter()
+        try:
+            self[name].read()
+            self._warmup_report[name] = dict(status='loaded', seconds=time.perf_counter() - t1, error=None)
+        except Exception as e:
+            self._warmup_report[name] = dict(status='failed', seconds=time.perf_counter() - t1, error=str(e))
+            raise
+
+    def warm_up(self, names: List[str] = None, max_workers: int = 4, wait: bool = True) -> Dict[str, dict]:
+        """
+        Load sources concurrently into the cache, using a pool of
+        ``max_workers`` threads. By default all sources are loaded.
+        If ``wait=False``, the method returns immediately and the sources
+        load in the background. Use :func:`is_ready` and :func:`wait_ready`
+        to check which sources are available already.
+
+        Returns
+        -------
+        report : dict
+            The warm-up report, see :func:`warmup_report`.
+
+        """
+        names = [self.resolve(n) for n in names] if names is not None else self.datasources
+
+        # start the pool and submit all sources not already warming up
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ruins-warmup')
+        for name in names:
+            if name in self._warmup and not self._warmup[name].done():
+                continue
+            self._warmup_report[name] = dict(status='pending', seconds=None, error=None)
+            self._warmup[name] = pool.submit(self._warm_source, name)
+        pool.shutdown(wait=False)
+
+        if wait:
+            self.wait_ready(names)
+        return self.warmup_report()
+
+    def is_ready(self, name_or_file: str) -> bool:
+        """True, if the source is loaded and can be served without waiting"""
+        name = self.resolve(name_or_file)
+        future = self._warmup.get(name)
+        if future is not None and not future.done():
+            return False
+        return self[name].is_loaded
+
+    def wait_ready(self, names: List[str] = None, timeout: float = None) -> bool:
+        """
+        Block until the warm-up of the given sources (default: all) finished.
+        Returns False, if the timeout was reached before.
+        """
+        names = [self.resolve(n) for n in names] if names is not None else list(self._warmup.keys())
+        futures = [self._warmup[n] for n in names if n in self._warmup]
+        _, pending = wait_futures(futures, timeout=timeout)
+        return len(pending) == 0
+
+    def warmup_report(self) -> Dict[str, dict]:
+        """
+        Return the status of the warm-up for each source. The status is one
+        of ``'pending'``, ``'loaded'`` or ``'failed'``. For finished sources
+        the load time in seconds and a possible error message are included.
+        """
+        return {name: dict(rep) for name, rep in self._warmup_report.items()}
+
+    def aggregate(self, name_or_file: str, variable: str, freq: str = 'Y', how: str = 'mean', station: Union[str, List[str]] = None, attrs: dict = None) -> Union[xr.Dataset, xr.DataArray]:
+        """
+        Return monthly or annual aggregates of a daily source. If the
+        aggregation pyramid ``<name>_pyramid`` of the source was built, and
+        is not older than the source file, the aggregates are read from
+        there, otherwise they are calculated. See :mod:`ruins.core.aggregates`.
+
+        Parameters
+        ----------
+        name_or_file : str
+            Name of the daily source
+        variable : str
+            Value of the ``vars`` dimension, like ``'Tmax'``
+        freq : str
+            ``'M'`` for monthly, ``'Y'`` for annual aggregates. The pandas
+            aliases ``'1M'`` and ``'1Y'`` are accepted as well.
+        how : str
+            One of ``'min'``, ``'mean'``, ``'max'`` and ``'sum'``
+        station : str, List[str]
+            Data variable(s) to select. If a single name is given, a
+            DataArray is returned.
+        attrs : dict
+            Select only data variables with matching attributes
+
+        """
+        name = self.resolve(name_or_file)
+        if aggregates.normalize_freq(freq) is None:
+            raise ValueError(f"freq has to be one of {', '.join(aggregates.FREQS.keys())}")
+        if how not in aggregates.HOWS:
+            raise ValueError(f"how has to be one of {', '.join(aggregates.HOWS)}")
+
+        pyramid = f'{name}{aggregates.SUFFIX}'
+        if pyramid in self._data_sources and self._pyramid_is_current(name, pyramid):
+            data = self.filter(pyramid, station=station, vars=variable, attrs=attrs, freq=aggregates.normalize_freq(freq), how=how)
+            data = aggregates.pyramid_selection(data, freq)
         else:
-            identifier = name_or_file
+            data = aggregates.aggregate_dataset(self.filter(name, station=station, vars=variable, attrs=attrs), freq, how)
+        
+        # drop the scalar coordinates of the selection
+        return data.drop_vars([c for c in data.coords if c != 'time'])
 
-        return self[identifier].read()
+    def _pyramid_is_current(self, name: str, pyramid: str) -> bool:
+        """True if the file of the pyramid is at least as new as the file of the daily source"""
+        try:
+            current = file_stamp(self[pyramid].path)[0] >= file_stamp(self[name].path)[0]
+        except (KeyError, AttributeError, OSError):
+            return False
+        if not current and self.debug:
+            print(f"[Warning]: {pyramid} is older than {name} and ignored. Rebuild it with ruins.core.aggregates.build_pyramids.")
+        return current
+
+    def check_sources(self) -> List[str]:
+        """
+        Check all loaded sources for changes on disk and start a background
+        reload for each stale source. Returns the names of stale sources.
+        """
+        stale = []
+        for name, source in list(self._data_sources.items()):
+            if isinstance(source, FileSource) and source.is_stale():
+                source.refresh()
+                stale.append(name)
+        return stale
+
+    def start_watcher(self, interval: float = 5.0) -> None:
+        """
+        Start a daemon thread, which calls :func:`check_sources` every
+        ``interval`` seconds. The thread only holds a weak reference to the
+        manager and stops, as soon as the manager is garbage collected or
+        :func:`stop_watcher` is called.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watcher_stop = threading.Event()
+        self._watcher = threading.Thread(target=_watch_sources, args=(weakref.ref(self), self._watcher_stop, interval), name='ruins-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Stop the watcher thread started by :func:`start_watcher`"""
+        self._watcher_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def filter(self, name_or_file: str, **kwargs):
+        """
+        Return a subset of a source. The keyword arguments are passed to
+        the :func:`filter <ruins.core.data_manager.FileSource.filter>` method
+        of the source.
+        """
+        return self[self.resolve(name_or_file)].filter(**kwargs)
 
-    def from_config(self, datapath: str = None, cache: bool = True, hot_load: bool = False, debug: bool = False, **kwargs) -> None:
+    def from_config(self, datapath: str = None, cache: bool = True, hot_load: bool = False, debug: bool = False, columnar: bool = False, columnar_dir: str = None, memory_budget: int = None, hot_load_workers: int = None, manifest_path: Union[str, bool] = None, check_interval: float = 2.0, watch_interval: float = None, io_workers: int = 4, shared: bool = False, share_dir: str = None, remote_cache_dir: str = None, snapshot_path: str = None, **kwargs) -> None:
         """
         Initialize the DataManager from a :class:`Config <ruins.core.Config>` object.
         """
@@ -201,13 +1586,53 @@ class DataManager(Mapping):
         self.cache = cache
         self.hot_load = hot_load
         self.debug = debug
+        self.columnar = columnar
+        self.columnar_dir = columnar_dir
+        self.memory_budget = int(memory_budget) if memory_budget is not None else None
 
         # file settings
         self._data_sources = {}
+        self._source_args: Dict[str, dict] = {}
+        self._manifest_path = manifest_path
+        self._manifest: Dict[str, dict] = {}
+        self.check_interval = check_interval
+        self.shared = shared
+        self.share_dir = share_dir
+        self.remote_cache_dir = remote_cache_dir
+        self._watcher: threading.Thread = None
+        self.io_workers = io_workers
+        self._executor: ThreadPoolExecutor = None
+        self._watcher_stop = threading.Event()
+
+        # least recently used order of cached sources
+        self._lru = OrderedDict()
+        self._lru_lock = threading.RLock()
+        self._cache_stats = dict(hits=0, misses=0, evictions=0)
+
+        # concurrent warm-up
+        self.hot_load_workers = hot_load_workers
+        self._warmup: Dict[str, Future] = {}
+        self._warmup_report: Dict[str, dict] = {}
 
         # infer data source
         if self._datapath is not None:
             self._infer_from_folder()
+
+        # add the remote sources
+        for name, args in self._config.get('remote_sources', {}).items():
+            self.add_remote_source(name, **args)
+
+        # serve the unchanged sources of the last snapshot
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            self.restore(snapshot_path)
+
+        # start the warm-up in the background
+        if self.hot_load and self.hot_load_workers:
+            self.warm_up(max_workers=self.hot_load_workers, wait=False)
+
+        # watch the loaded sources for changes
+        if watch_interval is not None:
+            self.start_watcher(interval=watch_interval)
     
     @property
     def datapath(self) -> str:
@@ -225,18 +1650,116 @@ class DataManager(Mapping):
     def datasources(self) -> List[DataSource]:
         return list(self._data_sources.keys())
 
+    @property
+    def manifest(self) -> Dict[str, dict]:
+        """The current manifest of the datapath, by path relative to the datapath"""
+        return {path: dict(entry) for path, entry in self._manifest.items()}
+
+    @property
+    def manifest_path(self) -> Union[str, None]:
+        if self._manifest_path is False or self.datapath is None:
+            return None
+        elif self._manifest_path is None:
+            key = hashlib.sha1(os.path.abspath(self.datapath).encode()).hexdigest()[:16]
+            return os.path.join(default_cache_dir(), 'manifests', f'{key}.json')
+        return self._manifest_path
+
+    def _list_files(self) -> List[str]:
+        """List all files in the datapath, which might be a data source"""
+        # get a list of all files
+        file_list = glob.glob(os.path.join(self.datapath, '*'))
+        file_list.extend(glob.glob(os.path.join(self.datapath, '**', '*')))
+
+        # skip the content of Zarr stores
+        return [f for f in file_list if not any(p.endswith('.zarr') for p in os.path.dirname(os.path.relpath(f, self.datapath)).split(os.sep))]
+
+    def _scan_manifest(self) -> Dict[str, dict]:
+        """
+        Build the manifest of the datapath. A file changed, if its size or
+        modification time changed. The content hash is not calculated here,
+        but on demand by :func:`_source_hash` and kept as long as the file
+        does not change, also across instances by the persisted manifest.
+        """
+        # previous entries, from this instance or the persisted manifest
+        known = dict(self._manifest)
+        mpath = self.manifest_path
+        if mpath is not None and os.path.exists(mpath):
+            try:
+                with open(mpath) as f:
+                    known = {**json.load(f), **known}
+            except (OSError, ValueError):
+                pass
+
+        manifest = {}
+        for path in self._list_files():
+            stat = os.stat(path)
+            entry = dict(size=stat.st_size, mtime=stat.st_mtime_ns, hash=None)
+            prev = known.get(os.path.relpath(path, self.datapath))
+            if prev is not None and prev['size'] == entry['size'] and prev['mtime'] == entry['mtime']:
+                entry['hash'] = prev.get('hash')
+            manifest[os.path.relpath(path, self.datapath)] = entry
+
+        return manifest
+
+    def _manifest_entry(self, path: str) -> Union[dict, None]:
+        """Manifest entry of the file path, if it is in the datapath"""
+        if path is None or self.datapath is None:
+            return None
+        return self._manifest.get(os.path.relpath(path, self.datapath))
+
+    def _save_manifest(self) -> None:
+        mpath = self.manifest_path
+        if mpath is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(mpath)), mode=0o700, exist_ok=True)
+            tmp = f'{mpath}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self._manifest, f, indent=2)
+            os.replace(tmp, mpath)
+        except OSError as e:
+            if self.debug:
+                print(f"[Warning]: Could not persist the manifest at {mpath}: {e}")
+
     def _infer_from_folder(self) -> None:
         """
         Read all files from the datapath as specified on instantiation.
-        Calls :func:`add_source` on each file.
+        Calls :func:`add_source` on each new or changed file and drops sources
+        of removed files. Sources of unchanged files are kept, including
+        their cached data.
         """
-        # get a list of all files
-        file_list = glob.glob(os.path.join(self.datapath, '*'))
-        file_list.extend(glob.glob(os.path.join(self.datapath, '**', '*')))
+        manifest = self._scan_manifest()
+
+        # files, which are new, gone or changed since the last scan
+        def changed(rel: str) -> bool:
+            old, new = self._manifest.get(rel), manifest.get(rel)
+            return old is None or new is None or (old['size'], old['mtime']) != (new['size'], new['mtime'])
+
+        # drop sources of files, which are gone or changed
+        for rel in [rel for rel in self._manifest.keys() if changed(rel)]:
+            path = os.path.join(self.datapath, rel)
+            for name in [n for n, src in self._data_sources.items() if getattr(src, 'path', None) == path]:
+                self._data_sources[name].evict()
+                del self._data_sources[name]
 
+        # add new or changed sources, in a stable order, as files of same
+        # name in different folders overwrite each other
+        managed = set(getattr(src, 'path', None) for src in self._data_sources.values())
+        for rel in sorted(manifest.keys()):
+            path = os.path.join(self.datapath, rel)
+            if path in managed or not changed(rel):
+                continue
+            self.add_source(path=path, not_exists='warn' if self.debug else 'ignore')
 
-        for fname in file_list:
-            self.add_source(path=fname, not_exists='warn' if self.debug else 'ignore')
+        self._manifest = manifest
+        self._save_manifest()
+
+    def rescan(self) -> None:
+        """
+        Rescan the datapath for new, changed or removed files.
+        See :func:`_infer_from_folder`.
+        """
+        self._infer_from_folder()
 
     def add_source(self, path: str, not_exists: str = 'raise') -> None:
         """
@@ -250,7 +1773,7 @@ class DataManager(Mapping):
         mimes = self._config.get('default_sources', {})
 
         # check if the config holds arguments for this source instance
-        args = self._config.get('sources_args', {}).get(os.path.basename(path), {})
+        args = dict(self._config.get('sources_args', {}).get(os.path.basename(path), {}))
 
         # get the basename
         try:
@@ -265,10 +1788,30 @@ class DataManager(Mapping):
             clsName = mimes[mime] if basename not in self._config else self._config[basename]
             BaseClass = self.resolve_class_name(clsName)
             
+            # keep sources of higher precedence, like databases imported from this file
+            current = self._data_sources.get(basename)
+            if current is not None and getattr(current, 'path', None) != path and getattr(current, 'precedence', 0) > BaseClass.precedence:
+                return
+
+            # the configured arguments identify the data of the source
+            self._source_args[basename] = dict(cls=BaseClass.__name__, **args)
+
             # add the source
 #            args = self._config.get(basename, {})
-            args.update({'path': path, 'cache': self.cache, 'hot_load': self.hot_load})
-            self._data_sources[basename] = BaseClass(**args)
+            args.setdefault('columnar', self.columnar)
+            args.setdefault('check_interval', self.check_interval)
+            args.setdefault('shared', self.shared)
+            if self.share_dir is not None:
+                args.setdefault('share_dir', self.share_dir)
+            if self.columnar_dir is not None:
+                args.setdefault('columnar_dir', self.columnar_dir)
+            # with concurrent warm-up, the source is loaded later
+            hot_load = self.hot_load and not self.hot_load_workers
+            args.update({'path': path, 'cache': self.cache or self.hot_load, 'hot_load': hot_load})
+            source = BaseClass(**args)
+            # avoid a reference cycle, the sources must not keep the manager alive
+            source.on_access = weakref.WeakMethod(self._on_access)
+            self._data_sources[basename] = source
         else:
             if not_exists == 'raise':
                 raise OSError(f"{path} is not a configured data source")
@@ -277,6 +1820,232 @@ class DataManager(Mapping):
             elif not_exists == 'warn':
                 print(f"{path} is found, but not a configured data source")
 
+    def _source_fingerprint(self, name: str) -> str:
+        """Hash of the class and the configured arguments of a source"""
+        dump = json.dumps(self._source_args.get(name, {}), sort_keys=True, default=str)
+        return hashlib.sha1(dump.encode()).hexdigest()
+
+    def _source_hash(self, source: FileSource) -> Union[str, None]:
+        """
+        Content hash of the file of source. For files in the datapath, the
+        hash is calculated once and kept in the manifest, as long as size
+        and modification time match.
+        """
+        entry = self._manifest_entry(source.path)
+        try:
+            if entry is None:
+                return content_hash(source.path)
+            stat = os.stat(source.path)
+            if (entry['size'], entry['mtime']) != (stat.st_size, stat.st_mtime_ns):
+                return content_hash(source.path)
+            if entry['hash'] is None:
+                entry['hash'] = content_hash(source.path)
+                self._save_manifest()
+            return entry['hash']
+        except OSError:
+            return None
+
+    def version(self, name_or_file: str) -> Union[str, None]:
+        """
+        Version token of a source, built from its configured arguments and
+        the content hash of the manifest, if it matches the served file,
+        or its :func:`version <ruins.core.data_manager.DataSource.version>`.
+        Thus, the token changes if the data changes, or if another
+        DataManager serves the source with a different configuration.
+        Returns None for unknown sources.
+        """
+        name = self.resolve(name_or_file)
+        if name not in self._data_sources:
+            return None
+        source = self[name]
+        token = source.version
+
+        # prefer the content hash, which is stable across copies of the file
+        entry = self._manifest_entry(getattr(source, 'path', None))
+        if entry is not None and token == f"{entry['mtime']}-{entry['size']}":
+            token = self._source_hash(source) or token
+        return f'{self._source_fingerprint(name)}:{token}'
+
+    def snapshot(self, path: str) -> List[str]:
+        """
+        Persist all loaded sources into the folder path. The data is stored
+        in the memory-mappable format of :mod:`ruins.core.shared`, along with
+        the content hash of each file and a fingerprint of the source
+        configuration. An existing snapshot at path is replaced. Lazy and
+        stale sources are skipped. Returns the names of the persisted sources.
+        """
+        path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=f'.{os.path.basename(path)}.', dir=os.path.dirname(path))
+
+        try:
+            entries = {}
+            for name, source in list(self._data_sources.items()):
+                source = getattr(source, 'reader', source)
+                data = getattr(source, 'data', None)
+                if not isinstance(source, FileSource) or data is None or getattr(source, 'lazy', False) or source.is_stale():
+                    continue
+                try:
+                    shared.export(data, os.path.join(tmp, name))
+                except TypeError as e:
+                    warnings.warn(f"Can't snapshot {name}: {e}")
+                    continue
+                entries[name] = dict(path=source.path, hash=self._source_hash(source), fingerprint=self._source_fingerprint(name))
+            
+            with open(os.path.join(tmp, 'snapshot.json'), 'w') as f:
+                json.dump(dict(created=time.time(), sources=entries), f, indent=2)
+
+            # replace the old snapshot
+            if os.path.exists(path):
+                old = f'{tmp}.old'
+                os.rename(path, old)
+                os.rename(tmp, path)
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.rename(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        return list(entries.keys())
+
+    def restore(self, path: str) -> List[str]:
+        """
+        Restore the sources persisted by :func:`snapshot` from the folder path.
+        Only sources whose file content and configuration did not change
+        since the snapshot are restored, as read-only memory-mapped data.
+        All other sources load from their files as usual. Returns the names
+        of the restored sources.
+        """
+        try:
+            with open(os.path.join(path, 'snapshot.json')) as f:
+                entries = json.load(f)['sources']
+        except (OSError, ValueError, KeyError) as e:
+            warnings.warn(f"Can't read the snapshot at {path}: {e}")
+            return []
+
+        restored = []
+        for name, entry in entries.items():
+            source = getattr(self._data_sources.get(name), 'reader', self._data_sources.get(name))
+            if not isinstance(source, FileSource) or source.is_loaded or source.path != entry['path']:
+                continue
+            
+            # stale snapshot
+            if entry['fingerprint'] != self._source_fingerprint(name) or entry['hash'] is None or entry['hash'] != self._source_hash(source):
+                continue
+            try:
+                data = shared.load(os.path.join(path, name))
+                stamp = file_stamp(source.path)
+            except (OSError, ValueError) as e:
+                warnings.warn(f"Can't restore {name} from the snapshot: {e}")
+                continue
+
+            source._swap(data, stamp)
+            with self._lru_lock:
+                self._lru[id(source)] = source
+            restored.append(name)
+        
+        return restored
+
+    def add_remote_source(self, name: str, url: str, **kwargs) -> None:
+        """
+        Add a file served via HTTP(S) as data source to the DataManager.
+        The file is downloaded on first read. The reader of the local copy
+        is chosen by the file extension of the url, unless a ``reader`` is
+        given. All keyword arguments are passed to the
+        :class:`HTTPSource <ruins.core.data_manager.HTTPSource>`.
+        """
+        self._source_args[name] = dict(cls=HTTPSource.__name__, url=url, **kwargs)
+        if 'reader' not in kwargs:
+            mime = os.path.basename(urlparse(url).path).split('.')[-1]
+            if mime in self._config.get('default_sources', {}):
+                kwargs['reader'] = self.resolve_class_name(self._config['default_sources'][mime])
+
+        # same defaults as for local files
+        kwargs.setdefault('columnar', self.columnar)
+        kwargs.setdefault('check_interval', self.check_interval)
+        kwargs.setdefault('shared', self.shared)
+        if self.share_dir is not None:
+            kwargs.setdefault('share_dir', self.share_dir)
+        if self.columnar_dir is not None:
+            kwargs.setdefault('columnar_dir', self.columnar_dir)
+        if self.remote_cache_dir is not None:
+            kwargs.setdefault('cache_dir', self.remote_cache_dir)
+        elif self.datapath is not None:
+            kwargs.setdefault('cache_dir', os.path.join(self.datapath, '.remote'))
+        kwargs['cache'] = self.cache or self.hot_load
+
+        source = HTTPSource(url=url, **kwargs)
+        source.on_access = weakref.WeakMethod(self._on_access)
+        self._data_sources[name] = source
+
+    def _on_access(self, source: FileSource, hit: bool) -> None:
+        """
+        Track the access of a cached source and evict the least recently
+        used sources, if the memory budget is exceeded.
+        """
+        with self._lru_lock:
+            self._cache_stats['hits' if hit else 'misses'] += 1
+            self._lru[id(source)] = source
+            self._lru.move_to_end(id(source))
+
+            if self.memory_budget is not None:
+                self._enforce_budget(keep=source, count_keep=hit)
+
+    def _enforce_budget(self, keep: FileSource = None, count_keep: bool = True) -> None:
+        """
+        Evict least recently used sources until the memory budget is met.
+        If count_keep is False, the source which was just loaded is only
+        counted from its next access. Sources are loaded eagerly on their
+        first read, thus counting it right away would evict the sources read
+        together with it, only to reload them on their next read.
+        """
+        with self._lru_lock:
+            # the source just read is never evicted
+            candidates = [s for s in self._lru.values() if s is not keep]
+            total = sum(s.nbytes for s in self._lru.values() if count_keep or s is not keep)
+
+            for source in candidates:
+                if total <= self.memory_budget:
+                    break
+                total -= source.nbytes
+                source.evict()
+                del self._lru[id(source)]
+                self._cache_stats['evictions'] += 1
+
+    def cache_info(self) -> dict:
+        """
+        Return the cache counters of this DataManager. Hits and misses count
+        reads of cached sources, evictions count the sources dropped due to
+        the memory budget. Additionally, the current memory usage in bytes and
+        the names of the currently cached sources are returned.
+        """
+        with self._lru_lock:
+            loaded = [name for name, s in self._data_sources.items() if s.is_loaded]
+            return dict(
+                **self._cache_stats,
+                memory=sum(self._data_sources[name].nbytes for name in loaded),
+                memory_budget=self.memory_budget,
+                loaded=loaded
+            )
+
+    def report(self) -> Dict[str, dict]:
+        """
+        Return the telemetry of all sources by name. Besides the
+        :attr:`stats <ruins.core.data_manager.FileSource.stats>` of each
+        source, the report contains the source class, path and if the
+        source is currently loaded.
+        """
+        report = {}
+        for name, source in self._data_sources.items():
+            report[name] = dict(
+                source=source.__class__.__name__,
+                path=getattr(source, 'path', None),
+                loaded=source.is_loaded,
+                **getattr(source, 'stats', dict(nbytes=source.nbytes))
+            )
+        return report
+
     def resolve_class_name(self, cls_name: str) -> Type[DataSource]:
         # checkout globals
         cls = globals().get(cls_name, False)
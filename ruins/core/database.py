@@ -0,0 +1,248 @@
+"""
+Embedded SQLite copies of tabular sources.
+
+The tables of the data folder are imported into one SQLite file each,
+``<name>.sqlite`` next to the original file. The
+:class:`DatabaseSource <ruins.core.data_manager.DatabaseSource>` of that
+file takes precedence over the original source of the same name, thus the
+DataManager serves the same DataFrame as before. Filters are translated into
+SQL and use the indices created on import, so option lists and subsets of
+large tables are queried without loading the whole table.
+
+Index, datetime, boolean and categorical columns are restored on read from
+the metadata table ``_ruins_meta``. Datasets are imported as long tables,
+indexed by their dimensions. As they can't replace the original dataset,
+they are stored as ``<name>_table.sqlite``.
+
+Import all tables of the data folder like:
+
+.. code-block:: bash
+
+    python -m ruins.core.database --datapath=./data
+
+"""
+from typing import List, Tuple, Union
+import os
+import json
+import sqlite3
+from contextlib import closing
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+# name of the metadata table
+META_TABLE = '_ruins_meta'
+
+# suffix of imported datasets
+TABLE_SUFFIX = '_table'
+
+
+def quote(name: str) -> str:
+    """Quote an identifier for SQLite"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _param(value):
+    # sqlite3 does not accept numpy scalars
+    return value.item() if hasattr(value, 'item') else value
+
+
+def to_frame(data: Union[pd.DataFrame, xr.Dataset, xr.DataArray]) -> pd.DataFrame:
+    """Convert a dataset into a long table, indexed by its dimensions"""
+    if isinstance(data, xr.DataArray):
+        return data.to_dataframe(name=data.name or 'value')
+    elif isinstance(data, xr.Dataset):
+        return data.to_dataframe()
+    return data
+
+
+def write_table(data: Union[pd.DataFrame, xr.Dataset, xr.DataArray], path: str, table: str = None, indices: List[str] = None) -> str:
+    """
+    Write data as table into the SQLite file at path. An existing file is
+    replaced atomically.
+
+    Parameters
+    ----------
+    data : pd.DataFrame, xr.Dataset
+        The table to write. Datasets are converted by :func:`to_frame`.
+    path : str
+        Location of the SQLite file
+    table : str
+        Name of the table. Defaults to the file name.
+    indices : List[str]
+        Columns to index. Defaults to the index, categorical, boolean and
+        text columns, as these are used to filter rows.
+
+    Returns
+    -------
+    path : str
+        The path of the SQLite file
+
+    """
+    df = to_frame(data)
+    table = table if table is not None else os.path.basename(path).split('.')[0]
+
+    # unnamed default indices are not stored
+    has_index = not (isinstance(df.index, pd.RangeIndex) and df.index.name is None)
+    index = [n if n is not None else f'level_{i}' for i, n in enumerate(df.index.names)] if has_index else []
+    frame = df.reset_index() if has_index else df.copy(deep=False)
+    frame.columns = index + [str(c) for c in df.columns]
+
+    # SQLite only knows integers, floats and text
+    meta = dict(
+        index=index,
+        datetime=[c for c, t in frame.dtypes.items() if pd.api.types.is_datetime64_any_dtype(t)],
+        categorical=[c for c, t in frame.dtypes.items() if isinstance(t, pd.CategoricalDtype)],
+        dtypes={c: str(t) for c, t in frame.dtypes.items() if isinstance(t, np.dtype) and t.kind in 'bif'}
+    )
+    if indices is None:
+        bools = [c for c, t in meta['dtypes'].items() if t == 'bool']
+        text = [c for c, t in frame.dtypes.items() if pd.api.types.is_string_dtype(t)]
+        indices = list(dict.fromkeys(index + meta['categorical'] + bools + text))
+
+    # write to a hidden file, which is not picked up as source
+    folder, fname = os.path.split(os.path.abspath(path))
+    tmp = os.path.join(folder, f'.{fname}.{os.getpid()}.tmp')
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    try:
+        with closing(sqlite3.connect(tmp)) as con:
+            frame.to_sql(table, con, index=False, chunksize=10000)
+            for col in indices:
+                con.execute(f'CREATE INDEX {quote(f"ix_{table}_{col}")} ON {quote(table)} ({quote(col)})')
+            con.execute(f'CREATE TABLE {quote(META_TABLE)} ("table" TEXT PRIMARY KEY, meta TEXT)')
+            con.execute(f'INSERT INTO {quote(META_TABLE)} VALUES (?, ?)', (table, json.dumps(meta)))
+            con.commit()
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return path
+
+
+def read_meta(con: sqlite3.Connection, table: str) -> dict:
+    """Read the metadata of table. Tables not written by :func:`write_table` have none."""
+    try:
+        row = con.execute(f'SELECT meta FROM {quote(META_TABLE)} WHERE "table" = ?', (table, )).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    meta = json.loads(row[0]) if row is not None else {}
+    return dict(index=meta.get('index', []), datetime=meta.get('datetime', []), categorical=meta.get('categorical', []), dtypes=meta.get('dtypes', {}))
+
+
+def time_bounds(time: slice) -> Tuple[str, str]:
+    """
+    Translate a time slice into inclusive bounds, as stored by SQLite.
+    Partial date strings include the whole period, like label-based
+    slicing in pandas: ``slice('2000', '2001')`` ends on 2001-12-31.
+    """
+    start = str(pd.Timestamp(time.start)) if time.start is not None else None
+    if time.stop is None:
+        stop = None
+    elif isinstance(time.stop, str):
+        stop = str(pd.Period(time.stop).end_time)
+    else:
+        stop = str(pd.Timestamp(time.stop))
+    return start, stop
+
+
+def build_query(table: str, meta: dict, columns: List[str] = None, attrs: dict = None, time: slice = None) -> Tuple[str, list]:
+    """
+    Build the SQL query and its parameters for a filter on table.
+    See :func:`filter <ruins.core.data_manager.DatabaseSource._filter>`.
+    """
+    # the index is always selected
+    if columns is not None and len(columns) > 0:
+        select = ', '.join(quote(c) for c in dict.fromkeys(meta['index'] + list(columns)))
+    else:
+        select = '*'
+
+    where, params = [], []
+    for col, value in (attrs if attrs is not None else {}).items():
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            where.append(f'{quote(col)} IN ({", ".join("?" * len(value))})')
+            params.extend(_param(v) for v in value)
+        else:
+            where.append(f'{quote(col)} = ?')
+            params.append(_param(value))
+
+    # the time slice applies to the first datetime index
+    if time is not None:
+        time_index = [c for c in meta['index'] if c in meta['datetime']]
+        if len(time_index) == 0:
+            raise ValueError(f"The table {table} has no time index.")
+        start, stop = time_bounds(time)
+        if start is not None:
+            where.append(f'{quote(time_index[0])} >= ?')
+            params.append(start)
+        if stop is not None:
+            where.append(f'{quote(time_index[0])} <= ?')
+            params.append(stop)
+
+    sql = f'SELECT {select} FROM {quote(table)}'
+    if len(where) > 0:
+        sql += ' WHERE ' + ' AND '.join(where)
+    return sql + ' ORDER BY rowid', params
+
+
+def restore(df: pd.DataFrame, meta: dict) -> pd.DataFrame:
+    """Restore the index and the column types of a queried table"""
+    for col in meta['datetime']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    for col, dtype in meta['dtypes'].items():
+        if col in df.columns and df[col].dtype != dtype and not (dtype.startswith('int') and df[col].isna().any()):
+            df[col] = df[col].astype(dtype)
+    for col in meta['categorical']:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    if len(meta['index']) > 0:
+        df = df.set_index(meta['index'])
+        # unnamed levels
+        df.index.names = [None if n.startswith('level_') and n[6:].isdigit() else n for n in meta['index']]
+    return df
+
+
+def import_sources(datapath: str = None, names: List[str] = None, config: Mapping = None) -> List[str]:
+    """
+    Import the given sources, or all CSV and DAT tables, into SQLite
+    files next to the source files. The sources are read with the
+    arguments of the config, like ``parse_dates`` or ``categorical``.
+    The paths are returned.
+    """
+    from ruins.core import Config, DataManager
+    if config is None:
+        config = Config() if datapath is None else Config(datapath=datapath)
+    
+    # read the original files, not the imported databases
+    mimes = {mime: cls for mime, cls in config['default_sources'].items() if cls != 'DatabaseSource'}
+    dm = DataManager(**{**config, 'default_sources': mimes})
+
+    if names is None:
+        names = [n for n in dm.datasources if dm[n].__class__.__name__ in ('CSVSource', 'DATSource')]
+
+    paths = []
+    for name in names:
+        source = dm[dm.resolve(name)]
+        data = source.read()
+
+        suffix = '' if isinstance(data, pd.DataFrame) else TABLE_SUFFIX
+        path = os.path.join(os.path.dirname(source.path), f'{name}{suffix}.sqlite')
+        print(f'Importing {path}...', end='', flush=True)
+        write_table(data, path, table=f'{name}{suffix}')
+        print('done.', flush=True)
+        paths.append(path)
+
+    return paths
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(import_sources)
@@ -1,12 +1,16 @@
 import streamlit as st
+import pandas as pd
 
 from ruins.core import Config, DataManager
+from ruins.core.cache import cache_stats
 
 
 def debug_view(dataManager: DataManager, config: Config, debug_name: str = None) -> None:
     '''
     Set Config['debug'] = 'True' to display debug view which
-    shows current Config and dataManager parameters.
+    shows current Config and dataManager parameters, the load
+    and read telemetry of each data source and the stats of the
+    memoized functions.
     '''
     if config.debug:
         name = f'DEBUG [{debug_name}]' if debug_name else 'DEBUG'
@@ -18,3 +22,22 @@ def debug_view(dataManager: DataManager, config: Config, debug_name: str = None)
 
         right.markdown('## Session state')
         right.json(st.session_state)
+
+        exp.markdown('## Data sources')
+        report = pd.DataFrame.from_dict(dataManager.report(), orient='index')
+        if len(report) > 0:
+            report['last_access'] = pd.to_datetime(report['last_access'], unit='s')
+            report['nbytes'] = report['nbytes'] / 1024**2
+            report['bytes_read'] = report['bytes_read'] / 1024**2
+            # only sources with a dtype policy report the size before and after the cast
+            for col in ('nbytes_raw', 'nbytes_cast'):
+                report[col] = pd.to_numeric(report[col]) / 1024**2
+            report = report.rename(columns={'nbytes': 'memory [MB]', 'bytes_read': 'read [MB]', 'nbytes_raw': 'before cast [MB]', 'nbytes_cast': 'after cast [MB]'})
+        exp.dataframe(report.drop(columns='path', errors='ignore'))
+
+        exp.markdown('## Memoized functions')
+        memo = pd.DataFrame.from_dict(cache_stats(), orient='index')
+        if len(memo) > 0:
+            memo['nbytes'] = memo['nbytes'] / 1024**2
+            memo = memo.rename(columns={'nbytes': 'memory [MB]'})
+        exp.dataframe(memo)
@@ -0,0 +1,398 @@
+"""
+Streamed, resumable and verified downloads of data archives.
+
+The archive is streamed to a ``.part`` file next to the target, thus the
+memory footprint does not depend on the archive size. Interrupted downloads
+are resumed with a HTTP Range request. Once complete, the file is verified
+against a checksum, like the ``'md5:...'`` checksums of the Zenodo record
+metadata, and moved to its final location.
+
+Single remote datasets are fetched with :func:`fetch`, which keeps a local
+copy and only transfers the file again, if it changed on the server.
+"""
+from typing import Callable, List
+import os
+import sys
+import json
+import math
+import time
+import zipfile
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def print_progress(label: str, done: int, total: int = None) -> None:
+    """Print a single progress line to stdout"""
+    if total:
+        msg = f'\r{label}: {done / total * 100:5.1f}% ({done}/{total})'
+    else:
+        msg = f'\r{label}: {done}'
+    print(msg, end='\n' if total and done >= total else '', flush=True, file=sys.stdout)
+
+
+def parse_checksum(checksum: str):
+    """
+    Parse a checksum like ``'md5:abc...'`` into a hashlib object and the
+    expected hex digest. Checksums without algorithm are assumed to be md5.
+    """
+    algorithm, _, digest = checksum.rpartition(':')
+    return hashlib.new(algorithm or 'md5'), digest.lower()
+
+
+def file_checksum(path: str, algorithm: str = 'md5', blocksize: int = 2**20) -> str:
+    """Hex digest of the file at path"""
+    h = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(blocksize), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def download_file(url: str, path: str, checksum: str = None, chunk_size: int = 2**20, retries: int = 3, progress: Callable[[str, int, int], None] = print_progress, session: requests.Session = None) -> str:
+    """
+    Stream the file at url to path.
+
+    The content is written to ``path + '.part'``. If that file exists, for
+    example after an interrupted download, only the missing bytes are
+    requested. Connection errors are retried ``retries`` times, resuming
+    the download each time.
+
+    Parameters
+    ----------
+    url : str
+        URL of the file
+    path : str
+        Location of the downloaded file
+    checksum : str
+        Expected checksum, as ``'<algorithm>:<hexdigest>'``. If given, the
+        completed download is verified and removed on mismatch.
+    progress : Callable
+        Called with a label, the bytes downloaded and the total bytes.
+        Pass None to disable progress reporting.
+
+    Returns
+    -------
+    path : str
+        The path of the downloaded file
+
+    """
+    session = session if session is not None else requests.Session()
+    part = f'{path}.part'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    for attempt in range(retries + 1):
+        try:
+            _stream_to_part(session, url, part, chunk_size, progress)
+            break
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            if attempt == retries:
+                raise
+            time.sleep(min(2 ** attempt, 10))
+
+    # verify
+    if checksum is not None:
+        h, expected = parse_checksum(checksum)
+        actual = file_checksum(part, algorithm=h.name)
+        if actual != expected:
+            os.remove(part)
+            raise IOError(f"Checksum mismatch for {url}: expected {expected}, got {actual}")
+
+    os.replace(part, path)
+    return path
+
+
+def _stream_to_part(session: requests.Session, url: str, part: str, chunk_size: int, progress: Callable) -> None:
+    """Download url into part, resuming from the existing part file"""
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    headers = {'Range': f'bytes={offset}-'} if offset > 0 else {}
+
+    with session.get(url, stream=True, headers=headers, timeout=60) as res:
+        # the part file is already complete
+        if res.status_code == 416:
+            return
+        res.raise_for_status()
+
+        # the server ignored the Range header - start over
+        if res.status_code != 206:
+            offset = 0
+
+        length = res.headers.get('Content-Length')
+        total = offset + int(length) if length is not None else None
+        done = offset
+
+        with open(part, 'ab' if offset > 0 else 'wb') as f:
+            for block in res.iter_content(chunk_size=chunk_size):
+                f.write(block)
+                done += len(block)
+                if progress is not None:
+                    progress('Downloading', done, total)
+
+        if total is not None and done < total:
+            raise requests.exceptions.ChunkedEncodingError(f"Connection closed after {done} of {total} bytes")
+
+
+def _read_validators(path: str) -> dict:
+    """Read the validators of the last response stored next to path"""
+    try:
+        with open(f'{path}.http.json') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_validators(path: str, validators: dict) -> None:
+    tmp = f'{path}.http.json.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(validators, f)
+    os.replace(tmp, f'{path}.http.json')
+
+
+def _conditional_headers(url: str, path: str) -> dict:
+    """Headers of a conditional request, if there is a local copy of url at path"""
+    validators = _read_validators(path) if os.path.exists(path) else {}
+    headers = {}
+    if validators.get('url') == url:
+        if validators.get('etag') is not None:
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified') is not None:
+            headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def remote_validators(url: str, path: str, timeout: float = 10, session: requests.Session = None) -> dict:
+    """
+    Return the ``ETag`` and ``Last-Modified`` validators of the file at url,
+    by a conditional HEAD request. If the local copy at path is still
+    valid, the stored validators of the local copy are returned. Nothing
+    is downloaded.
+    """
+    session = session if session is not None else requests.Session()
+    res = session.head(url, headers=_conditional_headers(url, path), timeout=timeout, allow_redirects=True)
+    if res.status_code == 304:
+        validators = _read_validators(path)
+        return dict(etag=validators.get('etag'), last_modified=validators.get('last_modified'))
+    res.raise_for_status()
+    return dict(etag=res.headers.get('ETag'), last_modified=res.headers.get('Last-Modified'))
+
+
+def _fetch_range(session: requests.Session, url: str, part: str, start: int, end: int, validator: str, timeout: float, callback: Callable[[int], None]) -> None:
+    """Download the bytes start to end (inclusive) of url into part"""
+    headers = {'Range': f'bytes={start}-{end}'}
+    if validator is not None:
+        headers['If-Range'] = validator
+
+    with session.get(url, stream=True, headers=headers, timeout=timeout) as res:
+        # a full response means the file changed since the first request
+        if res.status_code != 206:
+            raise IOError(f"{url} changed during the download (status {res.status_code})")
+        
+        with open(part, 'r+b') as f:
+            f.seek(start)
+            for block in res.iter_content(chunk_size=2**20):
+                f.write(block)
+                callback(len(block))
+
+
+def _probe(session: requests.Session, url: str, headers: dict, timeout: float) -> requests.Response:
+    """
+    Request the headers of url with a HEAD request, without transferring the
+    file. Servers which do not answer HEAD requests are asked for the first
+    byte instead. If such a server ignores the Range header, the response
+    streams the full file.
+    """
+    res = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+    if res.ok or res.status_code == 304:
+        return res
+    return session.get(url, stream=True, headers={**headers, 'Range': 'bytes=0-0'}, timeout=timeout)
+
+
+def fetch(url: str, path: str, workers: int = 4, range_size: int = 2**23, timeout: float = 60, progress: Callable[[str, int, int], None] = None, session: requests.Session = None) -> bool:
+    """
+    Fetch the file at url to path, unless the local copy is still valid.
+
+    The ``ETag`` and ``Last-Modified`` headers of the response are stored
+    next to the file, in ``path + '.http.json'``. If the file exists, the
+    request is sent with ``If-None-Match`` and ``If-Modified-Since`` and the
+    server only transfers the file if it changed. With more than one
+    worker, the size and range support are probed first, see :func:`_probe`.
+    Files larger than ``range_size`` are then fetched with up to ``workers``
+    concurrent range requests, if the server accepts them.
+
+    Parameters
+    ----------
+    url : str
+        URL of the file
+    path : str
+        Location of the local copy
+    workers : int
+        Maximum number of concurrent range requests
+    range_size : int
+        Minimum size of a range in bytes
+    progress : Callable
+        Called with a label, the bytes downloaded and the total bytes.
+
+    Returns
+    -------
+    changed : bool
+        False if the local copy was still valid, True if it was downloaded
+
+    """
+    session = session if session is not None else requests.Session()
+    part = f'{path}.part'
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # conditional request, if there is a local copy of the same url
+    headers = _conditional_headers(url, path)
+
+    # probe the size and range support, before any transfer
+    res, ranged = None, False
+    if workers > 1:
+        res = _probe(session, url, headers, timeout)
+        if res.status_code == 304:
+            res.close()
+            return False
+        res.raise_for_status()
+
+        etag, last_modified = res.headers.get('ETag'), res.headers.get('Last-Modified')
+        if res.status_code == 206:
+            size = res.headers.get('Content-Range', '').rpartition('/')[2]
+            total, accepts = (int(size) if size.isdigit() else None), True
+        else:
+            length = res.headers.get('Content-Length')
+            total, accepts = (int(length) if length is not None else None), res.headers.get('Accept-Ranges') == 'bytes'
+        ranged = total is not None and total > range_size and accepts
+
+        # only a GET, which ignored the Range header, holds the file
+        if ranged or res.request.method == 'HEAD' or res.status_code == 206:
+            res.close()
+            res = None
+
+    # small files are streamed from a single response
+    if not ranged:
+        if res is None:
+            res = session.get(url, stream=True, headers=headers, timeout=timeout)
+        with res:
+            if res.status_code == 304:
+                return False
+            res.raise_for_status()
+
+            length = res.headers.get('Content-Length')
+            total = int(length) if length is not None else None
+            etag, last_modified = res.headers.get('ETag'), res.headers.get('Last-Modified')
+
+            done = 0
+            with open(part, 'wb') as f:
+                for block in res.iter_content(chunk_size=2**20):
+                    f.write(block)
+                    done += len(block)
+                    if progress is not None:
+                        progress('Downloading', done, total)
+
+    # large files are split into concurrent range requests
+    if ranged:
+        n = min(workers, math.ceil(total / range_size))
+        bounds = [(i * total // n, (i + 1) * total // n - 1) for i in range(n)]
+        with open(part, 'wb') as f:
+            f.truncate(total)
+        
+        done = [0]
+        lock = threading.Lock()
+        def callback(nbytes: int):
+            with lock:
+                done[0] += nbytes
+                if progress is not None:
+                    progress('Downloading', done[0], total)
+
+        with ThreadPoolExecutor(max_workers=n, thread_name_prefix='ruins-fetch') as pool:
+            futures = [pool.submit(_fetch_range, session, url, part, start, end, etag or last_modified, timeout, callback) for start, end in bounds]
+            for future in futures:
+                future.result()
+
+    size = os.path.getsize(part)
+    if total is not None and size != total:
+        os.remove(part)
+        raise IOError(f"Incomplete download of {url}: expected {total} bytes, got {size}")
+
+    os.replace(part, path)
+    _write_validators(path, dict(url=url, etag=etag, last_modified=last_modified))
+    return True
+
+
+def _extract_members(archive: str, names: List[str], target: str, callback: Callable[[], None]) -> None:
+    # every worker needs its own file handle
+    with zipfile.ZipFile(archive) as zf:
+        for name in names:
+            zf.extract(name, target)
+            callback()
+
+
+def extract_archive(archive: str, target: str, workers: int = 4, progress: Callable[[str, int, int], None] = print_progress) -> List[str]:
+    """
+    Extract all members of the ZIP archive into target. The members are
+    distributed across ``workers`` threads. Members which would be extracted
+    outside of target are rejected.
+
+    Returns
+    -------
+    names : List[str]
+        The names of the extracted members
+
+    """
+    target = os.path.abspath(target)
+    with zipfile.ZipFile(archive) as zf:
+        infos = zf.infolist()
+
+    # check for path traversal
+    for info in infos:
+        dest = os.path.abspath(os.path.join(target, info.filename))
+        if os.path.commonpath([target, dest]) != target:
+            raise IOError(f"Archive member {info.filename} would be extracted outside of {target}")
+
+    # create the folders upfront, to avoid races between the workers
+    for info in infos:
+        folder = os.path.join(target, info.filename) if info.is_dir() else os.path.dirname(os.path.join(target, info.filename))
+        os.makedirs(folder, exist_ok=True)
+
+    # balance the workers by uncompressed size
+    buckets = [[] for _ in range(max(1, workers))]
+    sizes = [0] * len(buckets)
+    for info in sorted(infos, key=lambda i: i.file_size, reverse=True):
+        i = sizes.index(min(sizes))
+        buckets[i].append(info.filename)
+        sizes[i] += info.file_size
+
+    # count extracted members
+    done = [0]
+    lock = threading.Lock()
+    def callback():
+        with lock:
+            done[0] += 1
+            if progress is not None:
+                progress('Extracting', done[0], len(infos))
+
+    with ThreadPoolExecutor(max_workers=len(buckets), thread_name_prefix='ruins-extract') as pool:
+        futures = [pool.submit(_extract_members, archive, names, target, callback) for names in buckets if len(names) > 0]
+        for future in futures:
+            future.result()
+
+    return [info.filename for info in infos]
+
+
+def zenodo_archive(DOI: str, session: requests.Session = None, api: str = 'https://zenodo.org/api/records') -> dict:
+    """
+    Return the file metadata of the first ZIP archive of the Zenodo record
+    referenced by DOI. The dict holds the download ``url`` and the
+    ``checksum`` of the archive.
+    """
+    session = session if session is not None else requests.Session()
+    record = DOI.split('/')[-1].split('.')[1]
+
+    dat = session.get(f'{api}/{record}', timeout=60).json()
+    for f in dat['files']:
+        if f.get('type') == 'zip' or f.get('key', '').endswith('.zip'):
+            return dict(url=f['links']['self'], checksum=f.get('checksum'), size=f.get('size'))
+
+    raise IOError(f"The Zenodo record {record} has no ZIP archive.")
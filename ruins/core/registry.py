@@ -0,0 +1,211 @@
+"""
+Process-wide registry of :class:`DataManager <ruins.core.DataManager>` instances.
+
+Every streamlit rerun of every app builds its :class:`Config <ruins.core.Config>`
+again. The registry hands out one shared DataManager per config fingerprint,
+thus the data folder is only scanned once and the cached data survives reruns
+and is shared across sessions.
+
+The fingerprint is built from the config keys listed in :data:`FINGERPRINT_KEYS`,
+which are all arguments of :func:`DataManager.from_config <ruins.core.DataManager.from_config>`
+and the source settings, and from the source classes overwritten by file
+name. Configs which only differ in other keys, like the language or layout,
+share the same DataManager. At most ``max_instances`` DataManagers are kept,
+the least recently used one is released first.
+
+.. code-block:: python
+
+    from ruins.core.registry import REGISTRY
+
+    dm = REGISTRY.get(**config)
+    REGISTRY.register_hook('create', lambda dm, fp: print(f'new DataManager {fp}'))
+    REGISTRY.stats()
+
+"""
+from typing import Callable, Dict, List, Union
+import os
+import json
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from . import data_manager
+from .data_manager import DataManager, DataSource
+
+
+# config keys which identify a DataManager: the arguments of from_config and the source settings
+FINGERPRINT_KEYS = tuple(name for name, p in inspect.signature(DataManager.from_config).parameters.items() if name != 'self' and p.kind != p.VAR_KEYWORD) + ('datafile_names', 'sources_args', 'default_sources', 'remote_sources')
+
+# lifecycle events of the registry
+EVENTS = ('create', 'reuse', 'release')
+
+
+def fingerprint(config: dict) -> str:
+    """SHA-256 fingerprint of the parts of config, which identify a DataManager"""
+    parts = {key: config.get(key) for key in FINGERPRINT_KEYS}
+    if parts['datapath'] is not None:
+        parts['datapath'] = os.path.abspath(parts['datapath'])
+
+    # source classes can be overwritten by file name, like weather='ZarrSource'
+    parts['source_classes'] = {key: value for key, value in config.items() if isinstance(value, str) and is_source_class(value)}
+
+    dump = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def is_source_class(name: str) -> bool:
+    """True if name is a DataSource class, which can be set in the config"""
+    cls = getattr(data_manager, name, None)
+    return isinstance(cls, type) and issubclass(cls, DataSource)
+
+
+class DataManagerRegistry:
+    """
+    Thread-safe registry of shared DataManager instances.
+
+    Callbacks can be registered for the lifecycle events ``'create'``,
+    ``'reuse'`` and ``'release'``. They are called with the DataManager and
+    its fingerprint.
+
+    Parameters
+    ----------
+    factory : Callable
+        Callable to create a new DataManager from the config kwargs.
+        Defaults to the DataManager class itself.
+    max_instances : int
+        Maximum number of registered DataManagers. If exceeded, the least
+        recently used one is released. Pass None for no limit.
+
+    """
+    def __init__(self, factory: Callable[..., DataManager] = DataManager, max_instances: int = 4):
+        self.factory = factory
+        self.max_instances = max_instances
+        self._instances: Dict[str, DataManager] = OrderedDict()
+        # DataManagers being created, fingerprint -> Future
+        self._pending: Dict[str, Future] = {}
+        self._hooks: Dict[str, List[Callable]] = {event: [] for event in EVENTS}
+        self._lock = threading.RLock()
+        self._stats = dict(created=0, reused=0, released=0)
+
+    def register_hook(self, event: str, callback: Callable[[DataManager, str], None]) -> None:
+        """Register a callback for one of the lifecycle events"""
+        if event not in EVENTS:
+            raise AttributeError(f"event must be one of {', '.join(EVENTS)}")
+        self._hooks[event].append(callback)
+
+    def remove_hook(self, event: str, callback: Callable[[DataManager, str], None]) -> None:
+        """Remove a registered callback"""
+        self._hooks[event].remove(callback)
+
+    def _emit(self, event: str, dm: DataManager, fp: str) -> None:
+        for callback in self._hooks[event]:
+            callback(dm, fp)
+
+    def get(self, **kwargs) -> DataManager:
+        """
+        Return the shared DataManager for the given config kwargs. A new
+        instance is created, if none is registered for the fingerprint yet.
+        Concurrent sessions with the same fingerprint wait for the first one,
+        other fingerprints are not blocked by the creation.
+        """
+        fp = fingerprint(kwargs)
+
+        with self._lock:
+            future = self._pending.get(fp)
+            if fp in self._instances:
+                dm = self._instances[fp]
+                self._instances.move_to_end(fp)
+                self._stats['reused'] += 1
+                self._emit('reuse', dm, fp)
+                return dm
+            leader = future is None
+            if leader:
+                future = self._pending[fp] = Future()
+
+        if not leader:
+            dm = future.result()
+            with self._lock:
+                self._stats['reused'] += 1
+                self._emit('reuse', dm, fp)
+            return dm
+
+        try:
+            dm = self.factory(**kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[fp]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[fp]
+            self._instances[fp] = dm
+            self._stats['created'] += 1
+            self._emit('create', dm, fp)
+
+            # release the least recently used DataManagers
+            evicted = []
+            while self.max_instances is not None and len(self._instances) > self.max_instances:
+                evicted.append(self._pop(next(iter(self._instances))))
+        future.set_result(dm)
+
+        for old in evicted:
+            old.stop_watcher()
+        return dm
+
+    def _fingerprint_of(self, dm_or_fingerprint: Union[DataManager, str]) -> Union[str, None]:
+        if isinstance(dm_or_fingerprint, str):
+            return dm_or_fingerprint if dm_or_fingerprint in self._instances else None
+        for fp, dm in self._instances.items():
+            if dm is dm_or_fingerprint:
+                return fp
+        return None
+
+    def release(self, dm_or_fingerprint: Union[DataManager, str]) -> bool:
+        """
+        Remove a DataManager from the registry and stop its watcher thread.
+        Sessions still holding the instance can use it, but the next call
+        of :func:`get` creates a new one. Returns False if the DataManager
+        was not registered.
+        """
+        with self._lock:
+            fp = self._fingerprint_of(dm_or_fingerprint)
+            if fp is None:
+                return False
+            dm = self._pop(fp)
+
+        dm.stop_watcher()
+        return True
+
+    def _pop(self, fp: str) -> DataManager:
+        """Unregister the DataManager of fp, the lock has to be held"""
+        dm = self._instances.pop(fp)
+        self._stats['released'] += 1
+        self._emit('release', dm, fp)
+        return dm
+
+    def clear(self) -> None:
+        """Release all registered DataManagers"""
+        with self._lock:
+            for fp in list(self._instances.keys()):
+                self.release(fp)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of created, reused and released DataManagers"""
+        with self._lock:
+            return dict(**self._stats, instances=len(self._instances))
+
+    def __contains__(self, dm_or_fingerprint: Union[DataManager, str]) -> bool:
+        return self._fingerprint_of(dm_or_fingerprint) is not None
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(f'{k}={v}' for k, v in self.stats().items())})"
+
+
+# the process-wide registry
+REGISTRY = DataManagerRegistry()
@@ -0,0 +1,278 @@
+"""
+Cross-process shared backing for loaded datasets.
+
+The numeric arrays of a loaded source are exported once as memory-mapped
+``.npy`` files into a shared folder. Every process attaching to that folder
+maps the same files, thus the operating system holds only one physical
+copy, no matter how many streamlit server processes are running. By default
+the folder is placed into ``/dev/shm`` (POSIX shared memory), if available.
+
+The exported folders are keyed by the path and the file stamp of the source,
+so a changed file results in a new folder. Each attaching process registers
+itself in the ``refs`` subfolder. A folder is removed, as soon as the last
+process using it releases it or exits.
+
+The returned datasets are backed by read-only memory maps. Operations
+creating new objects work as usual, but in-place assignments raise an error.
+
+The metadata of an export is pickled. Thus, the shared folder is private to
+the user: it is created with mode ``0700`` and exports are only loaded from
+folders owned by the user, which are not writable by others.
+"""
+from typing import Any, Callable, Dict, Tuple
+import os
+import atexit
+import shutil
+import pickle
+import hashlib
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from .cache import is_private
+
+
+# arrays of these kinds can be memory-mapped
+SHAREABLE_KINDS = 'biufcmMSU'
+
+# folders attached by this process and their in-process reference count
+_ATTACHED: Dict[str, int] = {}
+_LOCK = threading.RLock()
+
+# attaching and releasing is serialized per folder
+_FOLDER_LOCKS: Dict[str, threading.RLock] = {}
+
+
+def default_share_dir() -> str:
+    """Default location of the shared folders, one per user"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, 'getuid') else os.getlogin()
+    return os.path.join(base, f'ruins-shared-{user}')
+
+
+def _private_dir(folder: str) -> str:
+    """Create folder with mode 0700 and check that it is private to the user"""
+    os.makedirs(folder, mode=0o700, exist_ok=True)
+    if not is_private(folder):
+        raise PermissionError(f"{folder} is not private to the current user")
+    return folder
+
+
+def _folder_lock(folder: str) -> threading.RLock:
+    with _LOCK:
+        return _FOLDER_LOCKS.setdefault(folder, threading.RLock())
+
+
+def share_folder(path: str, stamp: tuple, share_dir: str = None) -> str:
+    """Location of the shared copy of the file at path with the given stamp"""
+    share_dir = share_dir if share_dir is not None else default_share_dir()
+    key = hashlib.sha1(f'{os.path.abspath(path)};{stamp}'.encode()).hexdigest()[:16]
+    basename = os.path.basename(path).split('.')[0]
+    return os.path.join(share_dir, f'{basename}-{key}')
+
+
+def _save_array(arr: np.ndarray, folder: str, counter: list):
+    """Save arr as npy file, if it can be memory-mapped. Returns a placeholder."""
+    arr = np.asarray(arr)
+    if arr.dtype.kind not in SHAREABLE_KINDS:
+        return arr
+    fname = f'{len(counter)}.npy'
+    counter.append(fname)
+    np.save(os.path.join(folder, fname), np.ascontiguousarray(arr))
+    return ('__npy__', fname)
+
+
+def _load_array(ref, folder: str):
+    if isinstance(ref, tuple) and len(ref) == 2 and ref[0] == '__npy__':
+        # plain ndarray view, the memmap is kept alive as base
+        return np.load(os.path.join(folder, ref[1]), mmap_mode='r').view(np.ndarray)
+    return ref
+
+
+def _export_dataset(ds: xr.Dataset, folder: str) -> dict:
+    counter = []
+    variables = {}
+    for name, var in ds.variables.items():
+        variables[name] = dict(
+            dims=var.dims,
+            data=_save_array(var.values, folder, counter),
+            attrs=var.attrs,
+            encoding=var.encoding,
+            coord=name in ds.coords
+        )
+    return dict(kind='dataset', variables=variables, attrs=ds.attrs)
+
+
+def _import_dataset(meta: dict, folder: str) -> xr.Dataset:
+    data_vars, coords = {}, {}
+    for name, v in meta['variables'].items():
+        var = xr.Variable(v['dims'], _load_array(v['data'], folder), attrs=v['attrs'], encoding=v['encoding'])
+        (coords if v['coord'] else data_vars)[name] = var
+    return xr.Dataset(data_vars, coords=coords, attrs=meta['attrs'])
+
+
+def _export_frame(df: pd.DataFrame, folder: str) -> dict:
+    counter = []
+    columns = []
+    for i in range(df.shape[1]):
+        col = df.iloc[:, i]
+        # extension dtypes, like categoricals or pyarrow strings, are not shared
+        if isinstance(col.dtype, np.dtype):
+            columns.append(_save_array(col.to_numpy(), folder, counter))
+        else:
+            columns.append(col.array)
+
+    # simple indices are shared, others are pickled
+    index = df.index
+    if not isinstance(index, pd.MultiIndex) and isinstance(index.dtype, np.dtype):
+        index = dict(data=_save_array(index.to_numpy(), folder, counter), name=index.name)
+
+    return dict(kind='frame', columns=columns, names=df.columns, index=index, attrs=df.attrs)
+
+
+def _import_frame(meta: dict, folder: str) -> pd.DataFrame:
+    index = meta['index']
+    if isinstance(index, dict):
+        index = pd.Index(_load_array(index['data'], folder), name=index['name'], copy=False)
+
+    data = {i: _load_array(col, folder) for i, col in enumerate(meta['columns'])}
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.columns = meta['names']
+    df.attrs = meta['attrs']
+    return df
+
+
+def export(data: Any, folder: str) -> None:
+    """
+    Export data into folder. The folder is first written to a temporary
+    location and then renamed, thus other processes never see a partial
+    export. If the folder already exists, another process was faster and
+    the existing export is kept.
+    """
+    if isinstance(data, xr.DataArray):
+        data = data.to_dataset()
+    if not isinstance(data, (xr.Dataset, pd.DataFrame)):
+        raise TypeError(f"Can't share data of type {type(data).__name__}")
+
+    _private_dir(os.path.dirname(folder))
+    tmp = tempfile.mkdtemp(prefix=f'.{os.path.basename(folder)}.', dir=os.path.dirname(folder))
+    try:
+        meta = _export_dataset(data, tmp) if isinstance(data, xr.Dataset) else _export_frame(data, tmp)
+        with open(os.path.join(tmp, 'meta.pkl'), 'wb') as f:
+            pickle.dump(meta, f)
+        os.makedirs(os.path.join(tmp, 'refs'))
+        os.rename(tmp, folder)
+    except OSError:
+        # lost the race against another process
+        if not os.path.exists(os.path.join(folder, 'meta.pkl')):
+            raise
+    finally:
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load(folder: str) -> Any:
+    """
+    Load the exported data of folder as read-only memory-mapped views.
+    Raises a PermissionError, if the folder is not private to the user.
+    """
+    if not is_private(folder):
+        raise PermissionError(f"{folder} is not private to the current user")
+    with open(os.path.join(folder, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+    if meta['kind'] == 'dataset':
+        return _import_dataset(meta, folder)
+    return _import_frame(meta, folder)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def references(folder: str) -> list:
+    """Return the process ids of all live processes using folder"""
+    try:
+        pids = [int(p) for p in os.listdir(os.path.join(folder, 'refs')) if p.isdigit()]
+    except FileNotFoundError:
+        return []
+    return [pid for pid in pids if _pid_alive(pid)]
+
+
+def attach(path: str, stamp: tuple, loader: Callable[[], Any], share_dir: str = None) -> Tuple[Any, str]:
+    """
+    Attach to the shared copy of the file at path. If no process has
+    exported the file with this stamp yet, the data is loaded by calling
+    ``loader`` and exported. Returns the shared data and the folder, which
+    has to be passed to :func:`release` once the data is not needed anymore.
+    """
+    folder = share_folder(path, stamp, share_dir=share_dir)
+    _private_dir(os.path.dirname(folder))
+
+    # only loads of the same file wait for each other
+    with _folder_lock(folder):
+        for attempt in range(2):
+            if not os.path.exists(os.path.join(folder, 'meta.pkl')):
+                export(loader(), folder)
+            try:
+                # register this process
+                open(os.path.join(folder, 'refs', str(os.getpid())), 'a').close()
+                data = load(folder)
+                break
+            except FileNotFoundError:
+                # the folder was removed by another process in the meantime
+                if attempt == 1:
+                    raise
+
+        with _LOCK:
+            _ATTACHED[folder] = _ATTACHED.get(folder, 0) + 1
+
+    return data, folder
+
+
+def release(folder: str) -> None:
+    """
+    Release one reference of this process to folder. If no process is
+    using the folder anymore, it is removed. Memory maps which are still
+    alive in this process stay valid until they are garbage collected.
+    """
+    with _folder_lock(folder):
+        with _LOCK:
+            count = _ATTACHED.get(folder, 0) - 1
+            if count > 0:
+                _ATTACHED[folder] = count
+                return
+            _ATTACHED.pop(folder, None)
+
+        try:
+            os.remove(os.path.join(folder, 'refs', str(os.getpid())))
+        except FileNotFoundError:
+            pass
+        if len(references(folder)) == 0:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+def cleanup(share_dir: str = None) -> None:
+    """Remove all shared folders in share_dir, which are not used by a live process"""
+    share_dir = share_dir if share_dir is not None else default_share_dir()
+    if not os.path.isdir(share_dir):
+        return
+    for name in os.listdir(share_dir):
+        folder = os.path.join(share_dir, name)
+        if not name.startswith('.') and len(references(folder)) == 0:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+@atexit.register
+def _release_all() -> None:
+    for folder in list(_ATTACHED.keys()):
+        _ATTACHED[folder] = 1
+        release(folder)
@@ -0,0 +1,200 @@
+"""
+Precompute the memoized results of the apps.
+
+Without a warm cache, the first users of a freshly started app pay for
+every expensive computation. :func:`warm_cache` enumerates the parameter
+grids of the memoized functions from the data and computes them in a
+process pool. The results are persisted into the disk store of
+:mod:`ruins.core.cache`, which is shared with the apps, as long as they
+use the same ``RUINS_CACHE_DIR``.
+
+The grids cover:
+
+* ``calculate_climate_indices`` for every station and index
+* ``_reduce_weather_data`` for every station, variable and frequency of the weather app
+* ``ordered_sunburst_data`` for every order of the sunburst app
+* ``create_action_grid`` for the default filters of the landuse app
+
+Warm the cache for the default data folder like:
+
+.. code-block:: bash
+
+    ruins warm-cache --workers=4
+    python -m ruins warm-cache --datapath=./data --groups='[weather]'
+
+"""
+from typing import Dict, List, Tuple
+import os
+import time
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ruins.core import Config, DataManager
+from ruins.core.build import contextualized_data_manager
+
+
+# label, module, function name and keyword arguments of a computation
+Task = Tuple[str, str, str, dict]
+
+# variables and frequencies selectable in the weather app
+WEATHER_VARIABLES = ('T', 'Tmin', 'Tmax')
+WEATHER_FREQS = ('1Y', '1M')
+RCPS = ('rcp26', 'rcp45', 'rcp85')
+
+# the DataManager of a worker process
+_DATA_MANAGER: DataManager = None
+
+
+def _task(module: str, func: str, **kwargs) -> Task:
+    args = ', '.join(f'{k}={v!r}' for k, v in kwargs.items())
+    return f'{func}({args})', module, func, kwargs
+
+
+def _available(dataManager: DataManager, *names: str) -> bool:
+    """Check if all datasets are available, by name or Config.datafile_names alias"""
+    return all(dataManager.resolve(name) in dataManager.datasources for name in names)
+
+
+def climate_indices_tasks(dataManager: DataManager) -> List[Task]:
+    """Climate indices of every station"""
+    if not _available(dataManager, 'weather', 'climate'):
+        return []
+    from ruins.processing.climate_indices import index_variable, INDICES
+
+    stations = list(dataManager.read('weather').data_vars)
+    return [_task('ruins.processing.climate_indices', 'calculate_climate_indices', station=station, variable=index_variable(ci), ci=ci) for station in stations for ci in INDICES.keys()]
+
+
+def weather_tasks(dataManager: DataManager) -> List[Task]:
+    """Aggregated weather of every station, and of the coastal climate projections"""
+    if not _available(dataManager, 'weather'):
+        return []
+    tasks = []
+
+    stations = [*dataManager.read('weather').data_vars, None]
+    for station in stations:
+        for variable in WEATHER_VARIABLES:
+            for time in WEATHER_FREQS:
+                tasks.append(_task('ruins.apps.weather', '_reduce_weather_data', name='weather', station=station, variable=variable, time=time))
+
+    if _available(dataManager, 'cordex_coast'):
+        for rcp in RCPS:
+            for variable in WEATHER_VARIABLES:
+                for time in WEATHER_FREQS:
+                    tasks.append(_task('ruins.apps.weather', '_reduce_weather_data', name='cordex_coast', variable=variable, time=time, _filter=dict(RCP=rcp)))
+    return tasks
+
+
+def sunburst_tasks(dataManager: DataManager) -> List[Task]:
+    """Sunburst data of every order"""
+    if not _available(dataManager, 'climate'):
+        return []
+    from ruins.apps.sunburst import ORDERS
+
+    return [_task('ruins.apps.sunburst', 'get_cached_data', order=list(order)) for order in ORDERS]
+
+
+def windpower_tasks(dataManager: DataManager) -> List[Task]:
+    """Action grids of the default filters, with and without joint simulations only"""
+    if not _available(dataManager, 'wind_timeseries'):
+        return []
+    from ruins.apps.landuse import DEFAULT_YEARS
+
+    year = slice(str(DEFAULT_YEARS[0]), str(DEFAULT_YEARS[1]))
+    return [_task('ruins.processing.windpower', 'create_action_grid', resolution=0.1, filter_=dict(joint=joint, year=year)) for joint in (False, True)]
+
+
+# task groups by name
+GROUPS = dict(
+    climate_indices=climate_indices_tasks,
+    weather=weather_tasks,
+    sunburst=sunburst_tasks,
+    windpower=windpower_tasks,
+)
+
+
+def _init_worker(datapath: str, cache_dir: str) -> None:
+    global _DATA_MANAGER
+    # has to be set before the memoized functions are imported
+    if cache_dir is not None:
+        os.environ['RUINS_CACHE_DIR'] = cache_dir
+
+    conf = Config() if datapath is None else Config(datapath=datapath)
+    _DATA_MANAGER = contextualized_data_manager(**conf)
+
+
+def _run(task: Task) -> Tuple[str, float, str]:
+    """Run a task in a worker and return its label, wall time and error message, if any"""
+    label, module, func, kwargs = task
+    t1 = time.perf_counter()
+    try:
+        f = getattr(importlib.import_module(module), func)
+        f(_DATA_MANAGER, **kwargs)
+    except Exception as e:
+        return label, time.perf_counter() - t1, f'{e.__class__.__name__}: {e}'
+    return label, time.perf_counter() - t1, None
+
+
+def warm_cache(datapath: str = None, workers: int = None, cache_dir: str = None, groups: List[str] = None) -> Dict[str, object]:
+    """
+    Compute the parameter grids of the memoized functions in a process pool
+    and persist the results into the disk cache.
+
+    Parameters
+    ----------
+    datapath : str
+        Data folder, defaults to the folder of the Config
+    workers : int
+        Number of worker processes, defaults to the number of CPUs
+    cache_dir : str
+        Folder of the disk cache. Defaults to ``RUINS_CACHE_DIR`` or the
+        cache folder of the user, see :func:`default_cache_dir <ruins.core.cache.default_cache_dir>`.
+    groups : List[str]
+        Task groups to run, any of ``climate_indices``, ``weather``,
+        ``sunburst`` and ``windpower``. Defaults to all groups.
+
+    Returns
+    -------
+    summary : dict
+        Number of computed results, the labels of the failed tasks, total
+        wall time and summed computation time in seconds
+
+    """
+    groups = list(GROUPS.keys()) if groups is None else groups
+    unknown = [g for g in groups if g not in GROUPS]
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown task groups: {', '.join(unknown)}. Use any of {', '.join(GROUPS.keys())}")
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir)
+
+    # enumerate the parameter grids from the data
+    conf = Config() if datapath is None else Config(datapath=datapath)
+    dm = DataManager(**conf)
+    tasks = [task for group in groups for task in GROUPS[group](dm)]
+    workers = workers if workers is not None else os.cpu_count()
+    print(f'Warming {len(tasks)} results with {workers} workers...', flush=True)
+
+    # spawn fresh workers, the DataManager runs background threads
+    t1 = time.perf_counter()
+    failed, busy = [], 0.0
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker, initargs=(datapath, cache_dir)) as pool:
+        futures = [pool.submit(_run, task) for task in tasks]
+        for i, future in enumerate(as_completed(futures), start=1):
+            label, elapsed, error = future.result()
+            busy += elapsed
+            if error is not None:
+                failed.append(label)
+                print(f'[{i}/{len(tasks)}] {label} failed: {error}', flush=True)
+            else:
+                print(f'[{i}/{len(tasks)}] {label} {elapsed:.2f}s', flush=True)
+
+    total = time.perf_counter() - t1
+    print(f'Done. {len(tasks) - len(failed)} results in {total:.1f}s ({busy:.1f}s of computation), {len(failed)} failed.', flush=True)
+    return dict(results=len(tasks) - len(failed), failed=failed, seconds=total, busy_seconds=busy)
+
+
+if __name__ == '__main__':
+    import fire
+    fire.Fire(warm_cache)
@@ -8,14 +8,16 @@ from ruins.core import DataManager
 from ruins.core.cache import partial_memoize
 
 
-@partial_memoize(hash_names=['sel', 'cm'])
+@partial_memoize(hash_names=['sel', 'cm'], sources=['CORDEXgrid', 'CMIP5grid', 'stats'])
 def plt_map(dataManager: DataManager, sel='all', cm='none') -> go.Figure:
     # cordex_grid = xr.open_dataset('data/CORDEXgrid.nc')
     # cimp_grid = xr.open_dataset('data/CMIP5grid.nc')
     # stats = pd.read_csv('data/stats.csv', index_col=0)
-    cordex_grid = dataManager['CORDEXgrid'].read()
-    cimp_grid = dataManager['CMIP5grid'].read()
-    stats = dataManager['stats'].read()
+    # load the sources concurrently
+    data = dataManager.read_many(['CORDEXgrid', 'CMIP5grid', 'stats'])
+    cordex_grid = data['CORDEXgrid']
+    cimp_grid = data['CMIP5grid']
+    stats = data['stats']
 
     stats['ms'] = 15.
     stats['color'] = 'gray'
@@ -92,14 +94,8 @@ def plt_map(dataManager: DataManager, sel='all', cm='none') -> go.Figure:
             ))
 
             ac = '#df65b0'
-            if sel == 'krummhoern':
-                stats1 = stats.loc[stats.krummhoern == True]
-            elif sel == 'coast':
-                stats1 = stats.loc[stats.coast == True]
-            elif sel == 'niedersachsen':
-                stats1 = stats.loc[stats.niedersachsen == True]
-            elif sel == 'inland':
-                stats1 = stats.loc[stats.inland == True]
+            if sel in ('krummhoern', 'coast', 'niedersachsen', 'inland'):
+                stats1 = stats.loc[stats[sel]]
             else:
                 try:
                     stats1 = pd.DataFrame(stats.loc[sel]).T
@@ -1,7 +1,7 @@
-import streamlit as st
 import pandas as pd
 
 from ruins.core import DataManager
+from ruins.core.cache import partial_memoize
 
 
 INDICES = dict(
@@ -14,6 +14,16 @@ INDICES = dict(
 )
 
 
+def index_variable(ci: str) -> str:
+    """Return the variable an index is calculated from"""
+    if ci == 'prec':
+        return 'Prec'
+    elif ci in ('frost', 'tropic'):
+        return 'Tmin'
+    else:
+        return 'Tmax'
+
+
 def climate_index_agg(ts, index):
     """Aggregate the index days based on the available INDICES"""
      # drop NA
@@ -35,7 +45,7 @@ def climate_index_agg(ts, index):
         raise ValueError(f"The Index {index} is not supported. Use one of: {','.join(INDICES.keys())}")
 
 
-@st.experimental_memo
+@partial_memoize(hash_names=['station', 'variable', 'ci', 'rolling_windows', 'rolling_center', 'rcps'], sources=['weather', 'cordex_krummh'], manager='_dataManager', store='disk')
 def calculate_climate_indices(_dataManager: DataManager, station: str, variable: str, ci: str, rolling_windows=(10, 5), rolling_center=True, rcps=('rcp26', 'rcp45', 'rcp85')) -> pd.DataFrame:
     """
     Calculates all relevant climate indices for the given climate data, as configured in the DataManager.
@@ -71,8 +81,8 @@ def calculate_climate_indices(_dataManager: DataManager, station: str, variable:
     """
     dataManager = _dataManager
     # load data
-    weather = dataManager['weather'].read()[station].sel(vars=variable).to_dataframe()[station].dropna()
-    climate = dataManager['cordex_krummh'].read().sel(vars=variable).to_dataframe()
+    weather = dataManager.filter('weather', station=station, vars=variable).to_dataframe()[station].dropna()
+    climate = dataManager.filter('cordex_krummh', vars=variable).to_dataframe()
     climate.drop('vars', axis=1, inplace=True)
 
     # get weather index and rolling
@@ -6,9 +6,9 @@ import pandas as pd
 def multiindex_pdsi_data(pdsi: pd.DataFrame, grouping: List[str] = ['rcp', 'gcm'], filters: dict = None, inplace: bool = False) -> pd.DataFrame:
     """
     """
-    # make a copy if not inplace
+    # only the columns are changed, a shallow copy is enough
     if not inplace:
-        data = pdsi.copy()
+        data = pdsi.copy(deep=False)
     else:
         data = pdsi
 
@@ -8,6 +8,7 @@ import pandas as pd
 from scipy.stats import gaussian_kde
 
 from ruins.core import DataManager
+from ruins.core.cache import partial_memoize
 
 
 TURBINES = dict(
@@ -128,7 +129,7 @@ def load_windpower_data(dataManager: DataManager, joint_only: bool = False) -> p
     """
     
     # read windpower timeseries data
-    raw = dataManager.read('wind_timeseries').copy()
+    raw = dataManager.read('wind_timeseries')
 
     # build the MultiIndex
     multi_index = pd.MultiIndex.from_tuples(
@@ -381,6 +382,7 @@ def atk(ce: Union[np.array, float], alpha: float = 0.75) -> Tuple[float]:
     return (u, up)
 
 
+@partial_memoize(hash_names=['resolution', 'filter_'], sources=['wind_timeseries'], store='disk')
 def create_action_grid(dataManager: DataManager, resolution: float = 0.1, filter_: dict = {}) -> Tuple[list, list]:
     """
     Create a grid of management actions by balacing all three turbine types.
@@ -424,6 +426,7 @@ def create_action_grid(dataManager: DataManager, resolution: float = 0.1, filter
     return actions, scenarios
 
 
+@partial_memoize(hash_names=['actions', 'gamma', 'alpha'])
 def uncertainty_analysis(actions: List[pd.DataFrame], gamma: float = 1.2, alpha: float = 0.75) -> pd.DataFrame:
     """
     Run the uncertainty analysis for a list of provisioned windpower scenarios. Each 
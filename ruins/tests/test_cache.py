@@ -0,0 +1,180 @@
+"""
+Test the memoization of expensive computations
+"""
+import os
+import time
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+
+from ruins.core.cache import partial_memoize, stable_hash, cache_stats, DiskStore
+
+
+def test_keys_bound_to_signature():
+    """Positional, keyword and default arguments result in the same key"""
+    calls = []
+
+    @partial_memoize(hash_names=['name', 'time', '_filter'])
+    def reduce(dataManager, name: str, time: str = '1Y', _filter: dict = None):
+        calls.append(1)
+        return f'{name}-{time}-{_filter}'
+
+    assert reduce(None, 'weather') == reduce(object(), 'weather', '1Y') == reduce(None, name='weather', time='1Y')
+    assert len(calls) == 1
+
+    # dict order does not matter, values do
+    reduce(None, 'climate', _filter=dict(RCP='rcp45', GCM='MPI'))
+    reduce(None, 'climate', _filter=dict(GCM='MPI', RCP='rcp45'))
+    reduce(None, 'climate', _filter=dict(GCM='MPI', RCP='rcp85'))
+    assert len(calls) == 3
+
+    # values equal to a parameter name are not confused with it
+    assert reduce(None, 'time') != reduce(None, 'weather', 'time')
+    stats = reduce.cache.stats()
+    assert stats['hits'] == 3 and stats['misses'] == 5
+    assert reduce.cache.name in cache_stats()
+
+
+def test_unknown_hash_names():
+    """hash_names have to be parameters of the function"""
+    with pytest.raises(ValueError):
+        @partial_memoize(hash_names=['nope'])
+        def f(a):
+            return a
+
+
+def test_stable_hash():
+    """Hashes are stable across containers and arrays"""
+    assert stable_hash({'a': [1, 2], 'b': slice('2000', '2001')}) == stable_hash({'b': slice('2000', '2001'), 'a': [1, 2]})
+    assert stable_hash((1, 2)) != stable_hash([1, 2])
+    assert stable_hash(np.arange(5)) == stable_hash(np.arange(5))
+    assert stable_hash(np.arange(5)) != stable_hash(np.arange(6))
+
+    # frames differing in column names, dtypes or row order
+    df = pd.DataFrame(dict(a=[1, 2, 3], b=[4.0, 5.0, 6.0]))
+    assert stable_hash(df) == stable_hash(df.copy())
+    assert stable_hash(df) != stable_hash(df.rename(columns=dict(a='c')))
+    assert stable_hash(df) != stable_hash(df.iloc[::-1])
+    assert stable_hash(df) != stable_hash(df.astype(dict(a='float64')))
+
+
+def test_lru_and_ttl():
+    """Results are evicted by count, size and age"""
+    @partial_memoize(hash_names=['n'], max_entries=2)
+    def count(n):
+        return n
+
+    count(1); count(2); count(1); count(3)
+    stats = count.cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    count(1)
+    assert count.cache.stats()['hits'] == 2
+
+    @partial_memoize(hash_names=['n'], max_entries=None, max_bytes=10000)
+    def array(n):
+        return np.zeros(n)
+
+    array(500); array(600); array(250)
+    assert array.cache.stats()['entries'] == 2 and array.cache.stats()['evictions'] == 1
+    assert array.cache.stats()['nbytes'] <= 10000
+
+    # results larger than the limit are not cached
+    array(2000)
+    assert array.cache.stats()['entries'] == 2
+
+    @partial_memoize(hash_names=['n'], ttl=0.05)
+    def expiring(n):
+        return n
+
+    expiring(1)
+    time.sleep(0.1)
+    expiring(1)
+    assert expiring.cache.stats()['expired'] == 1 and expiring.cache.stats()['misses'] == 2
+
+
+def test_disk_store(tmp_path):
+    """Results are persisted by type and shared between caches of the same folder"""
+    calls = []
+
+    def compute(kind):
+        calls.append(kind)
+        if kind == 'frame':
+            return pd.DataFrame({'a': np.arange(3.)}, index=pd.Index(['x', 'y', 'z'], name='id'))
+        elif kind == 'array':
+            return np.arange(4)
+        return {'kind': kind}
+
+    # two decorations of the same function act like two processes
+    first = partial_memoize(hash_names=['kind'], store='disk', cache_dir=str(tmp_path))(compute)
+    second = partial_memoize(hash_names=['kind'], store='disk', cache_dir=str(tmp_path))(compute)
+
+    for kind in ('frame', 'array', 'other'):
+        first(kind)
+    folder = first.cache.disk.folder
+    assert sorted(os.path.splitext(f)[1] for f in os.listdir(folder)) == ['.npy', '.parquet', '.pkl']
+
+    pd.testing.assert_frame_equal(second('frame'), first('frame'))
+    np.testing.assert_array_equal(second('array'), np.arange(4))
+    assert second('other') == {'kind': 'other'}
+    assert len(calls) == 3
+    assert second.cache.stats()['disk_hits'] == 3
+
+    # the folder is capped by size, the least recently used are removed
+    store = DiskStore(str(tmp_path / 'capped'), max_bytes=3000)
+    for i in range(5):
+        store.set(f'k{i}', np.zeros(100))
+        time.sleep(0.01)
+    assert store.nbytes <= 3000
+    assert store.get('k4')[0] and not store.get('k0')[0]
+    assert not any(f.endswith('.tmp') for f in os.listdir(store.folder))
+
+    # unreadable files are treated as misses
+    with open(os.path.join(store.folder, 'broken.pkl'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert store.get('broken') == (False, None)
+    assert not os.path.exists(os.path.join(store.folder, 'broken.pkl'))
+
+    # folders writable by others are not used
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with open(shared / 'planted.pkl', 'wb') as f:
+        pickle.dump('planted', f)
+    with pytest.warns(UserWarning):
+        assert DiskStore(str(shared)).get('planted') == (False, None)
+    assert oct(os.stat(folder).st_mode & 0o777) == oct(0o700)
+
+    with pytest.raises(ValueError):
+        partial_memoize(hash_names=['kind'], store='redis')
+
+
+def test_single_flight():
+    """Concurrent calls with the same key compute the result only once"""
+    calls = []
+
+    @partial_memoize(hash_names=['n'])
+    def slow(n):
+        calls.append(n)
+        time.sleep(0.2)
+        if n < 0:
+            raise ValueError('negative')
+        return [n]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(slow, [1, 1, 1, 1]))
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert slow.cache.stats()['deduplicated'] == 3
+
+    # errors are raised in all waiting calls and not cached
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(slow, -1) for _ in range(2)]
+    for future in futures:
+        with pytest.raises(ValueError):
+            future.result()
+    assert calls.count(-1) == 1
+    with pytest.raises(ValueError):
+        slow(-1)
+    assert calls.count(-1) == 2
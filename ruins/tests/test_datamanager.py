@@ -1,14 +1,34 @@
 import xarray as xr
+import numpy as np
+import pandas as pd
 import os
+import time
+import asyncio
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import pytest
 
 from ruins.core import DataManager
-from ruins.core.data_manager import HDF5Source
+from ruins.core.data_manager import HDF5Source, ZarrSource, ParquetSource, HTTPSource, DatabaseSource
+from ruins.core.database import import_sources
+from ruins.core.aggregates import build_pyramids
+from ruins.core.cache import partial_memoize
+from ruins.tests.util import get_test_config, serve_directory
+
+TESTDATA = os.path.join(os.path.dirname(__file__), 'testdata')
 
 # some datasources are backed by git-lfs which have to be disabled on 
 # github actions
 NO_LFS = 'NO_LFS' in os.environ
 
 
+def _same_buffers(a, b) -> bool:
+    """True if the data variables of a and b share their memory"""
+    if isinstance(a, xr.DataArray):
+        return np.shares_memory(a.values, b.values)
+    return all(np.shares_memory(a[v].values, b[v].values) for v in a.data_vars)
+
+
 def test_default_manager():
     """Instantiate the default data manager"""
     dm = DataManager()
@@ -38,3 +58,628 @@ def test_weather_dataset():
 
     data = weather.read()
     assert isinstance(data, xr.Dataset)
+
+
+def test_lazy_weather_dataset():
+    """Open the weather dataset dask-backed"""
+    pytest.importorskip('dask')
+    conf = get_test_config()
+    conf.sources_args['weather.nc'] = dict(lazy=True, chunks={'time': 10})
+    dm = DataManager(**conf)
+
+    # the source should be in lazy mode
+    assert dm['weather'].lazy
+
+    # the data is chunked and stays lazy on selection
+    data = dm.read('weather')
+    assert data['coast'].chunks is not None
+    sub = data['coast'].sel(vars='Tmax').resample(time='1MS').max()
+    assert sub.chunks is not None
+
+    # compare to the eager dataset
+    eager = DataManager(**get_test_config()).read('weather')
+    assert eager['coast'].chunks is None
+    assert (sub.values == eager['coast'].sel(vars='Tmax').resample(time='1MS').max().values).all()
+
+
+def test_columnar_copies(tmp_path):
+    """Sources are converted to columnar copies on first read"""
+    pytest.importorskip('zarr')
+    pytest.importorskip('pyarrow')
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path)
+    shutil.copy(os.path.join(os.path.dirname(TESTDATA), '..', '..', 'data', 'stats.csv'), tmp_path)
+
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf, columnar=True)
+
+    # first read converts
+    weather = dm.read('weather')
+    stats = dm.read('stats')
+    assert os.path.exists(os.path.join(tmp_path, '.columnar', 'weather.zarr'))
+    assert os.path.exists(os.path.join(tmp_path, '.columnar', 'stats.parquet'))
+
+    # a new manager reads the copies
+    dm2 = DataManager(**conf, columnar=True)
+    assert dm2.datasources == dm.datasources
+    xr.testing.assert_equal(weather, dm2.read('weather'))
+    pd.testing.assert_frame_equal(stats, dm2.read('stats'))
+
+
+def test_zarr_and_parquet_sources(tmp_path):
+    """Zarr stores and Parquet files are managed as sources"""
+    pytest.importorskip('zarr')
+    pytest.importorskip('pyarrow')
+    weather = xr.open_dataset(os.path.join(TESTDATA, 'weather.nc'))
+    weather.to_zarr(os.path.join(tmp_path, 'weather.zarr'))
+    weather['coast'].to_pandas().to_parquet(os.path.join(tmp_path, 'coast.parquet'))
+
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf)
+    assert sorted(dm.datasources) == ['coast', 'weather']
+    assert isinstance(dm['weather'], ZarrSource)
+    assert isinstance(dm['coast'], ParquetSource)
+
+    xr.testing.assert_equal(weather, dm.read('weather'))
+    assert dm.read('coast').shape == (100, 16)
+
+
+def test_memory_budget_eviction():
+    """Least recently used sources are evicted when over budget"""
+    conf = get_test_config()
+    dm = DataManager(**conf, memory_budget=300000)
+
+    # load the weather data fully into memory
+    dm.read('weather').load()
+    assert dm['weather'].nbytes > 200000
+    assert dm.cache_info()['loaded'] == ['weather']
+
+    # loading a second dataset exceeds the budget on next access
+    dm.read('cordex_coast').load()
+    dm.read('weather')
+    info = dm.cache_info()
+    assert not dm['cordex_coast'].is_loaded
+    assert info['loaded'] == ['weather']
+    assert info['evictions'] == 1
+    assert info['hits'] == 1 and info['misses'] == 2
+
+    # evicted sources reload transparently
+    assert isinstance(dm.read('cordex_coast'), xr.Dataset)
+    assert dm.cache_info()['misses'] == 3
+
+
+def test_filter_netcdf():
+    """Filter is pushed down into netCDF sources"""
+    dm = DataManager(**get_test_config())
+    weather = dm.read('weather')
+
+    # single station
+    sub = dm.filter('weather', station='coast', vars='Tmax', time=slice('1947-02-01', '1947-02-28'))
+    assert isinstance(sub, xr.DataArray)
+    assert sub.shape == (28, )
+    assert (sub.values == weather['coast'].sel(vars='Tmax', time=slice('1947-02-01', '1947-02-28')).values).all()
+
+    # select by attributes
+    rcp = dm.filter('climate', attrs={'RCP': 'rcp45'}, vars=['T', 'Tmax'])
+    assert all(v.endswith('rcp45') for v in rcp.data_vars)
+    assert rcp.sizes['vars'] == 2
+
+    # same query is served from the query cache
+    assert _same_buffers(dm.filter('weather', vars='Tmax', time=slice('1947-02-01', '1947-02-28'), station='coast'), sub)
+
+
+def test_filter_netcdf_uncached():
+    """Filters of uncached netCDF sources only read the selection"""
+    dm = DataManager(**get_test_config())
+    sub = dm.filter('weather', station='coast', vars='Tmax', time=slice('1947-02-01', '1947-02-28'))
+
+    assert not dm['weather'].is_loaded
+    assert 0 < dm['weather'].stats['bytes_read'] < os.path.getsize(dm['weather'].path) / 100
+    assert (sub.values == dm.read('weather')['coast'].sel(vars='Tmax', time=slice('1947-02-01', '1947-02-28')).values).all()
+
+
+def test_filter_csv(tmp_path):
+    """Filter reads only needed columns and rows of CSV sources"""
+    shutil.copy(os.path.join(TESTDATA, '..', '..', '..', 'data', 'stats.csv'), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf)
+
+    sub = dm.filter('stats', columns=['lat', 'lon'], attrs={'krummhoern': True})
+    assert not dm['stats'].is_loaded
+    assert sub.columns.tolist() == ['lat', 'lon']
+
+    # compare to in-memory filtering
+    stats = dm.read('stats')
+    pd.testing.assert_frame_equal(sub, stats.loc[stats.krummhoern, ['lat', 'lon']])
+    pd.testing.assert_frame_equal(sub, dm['stats']._filter(columns=['lat', 'lon'], attrs={'krummhoern': True}))
+
+
+def test_concurrent_warm_up():
+    """Hot loading warms up all sources in the background"""
+    conf = get_test_config()
+    conf['hot_load'] = True
+    dm = DataManager(**conf, hot_load_workers=3)
+
+    assert dm.wait_ready(timeout=30)
+    report = dm.warmup_report()
+    assert sorted(report.keys()) == sorted(dm.datasources)
+    assert all(r["status"] == "loaded" and r["seconds"] >= 0 for r in report.values()), report
+    assert dm.is_ready('weather') and dm.is_ready('climate')
+
+    # a single source can be warmed up on request
+    dm['weather'].evict()
+    assert not dm.is_ready('weather')
+    dm.warm_up(names=['weather'])
+    assert dm.is_ready('weather')
+
+
+def test_manifest_rescan(tmp_path):
+    """Rescan only rebuilds sources of changed files"""
+    for fname in ('weather.nc', 'cordex_coast.nc', 'cordex_krummh.nc'):
+        shutil.copy(os.path.join(TESTDATA, fname), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    conf['manifest_path'] = str(tmp_path / '.manifest.json')
+    dm = DataManager(**conf)
+
+    # the manifest is persisted, without hashing the files
+    assert os.path.exists(tmp_path / '.manifest.json')
+    assert len(dm.manifest) == 3
+    assert all(entry['hash'] is None for entry in dm.manifest.values())
+    weather, coast = dm['weather'], dm['cordex_coast']
+    dm.read('weather')
+
+    # change one file and remove another
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path / 'cordex_coast.nc')
+    os.remove(tmp_path / 'cordex_krummh.nc')
+    dm.rescan()
+
+    assert dm['weather'] is weather and weather.is_loaded
+    assert dm['cordex_coast'] is not coast
+    assert 'cordex_krummh' not in dm.datasources
+    assert len(dm.manifest) == 2
+
+    # the hash is calculated on demand and reused by a new manager
+    dm.version('weather')
+    assert dm.manifest['weather.nc']['hash'] is not None
+    assert DataManager(**conf).manifest == dm.manifest
+
+
+def test_manifest_nested_names(tmp_path):
+    """Files of same name in nested folders do not flip on rescan"""
+    for folder in ('a', 'b'):
+        os.makedirs(tmp_path / folder)
+        shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path / folder)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf)
+
+    assert {os.path.join('a', 'weather.nc'), os.path.join('b', 'weather.nc')} <= set(dm.manifest.keys())
+    weather = dm['weather']
+    dm.rescan()
+    assert dm['weather'] is weather
+
+    # by default, the manifest is kept in the user cache
+    assert os.path.exists(dm.manifest_path)
+    assert sorted(os.listdir(tmp_path)) == ['a', 'b']
+
+
+def test_reload_changed_file(tmp_path):
+    """Changed files are reloaded in the background and swapped in"""
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf, check_interval=0)
+
+    old = dm.read('weather')
+    assert not dm['weather'].is_stale()
+
+    # replace the file with changed data
+    changed = old.load() + 1
+    changed.to_netcdf(tmp_path / 'new.nc.tmp')
+    os.replace(tmp_path / 'new.nc.tmp', tmp_path / 'weather.nc')
+    assert dm['weather'].is_stale()
+
+    # the reader is not blocked, but gets the old data until the reload finished
+    assert _same_buffers(dm.read('weather'), old)
+    dm['weather']._reload_thread.join()
+    new = dm.read('weather')
+    assert not _same_buffers(new, old)
+    xr.testing.assert_allclose(new, changed)
+    assert not dm['weather'].is_stale()
+
+    # the watcher picks up changes without reads
+    changed.to_netcdf(tmp_path / 'new.nc.tmp')
+    os.replace(tmp_path / 'new.nc.tmp', tmp_path / 'weather.nc')
+    assert dm.check_sources() == ['weather']
+    dm['weather'].refresh(wait=True)
+    assert not _same_buffers(dm.read('weather'), new)
+
+
+def _memmap_file(arr):
+    """Return the file backing a memory-mapped array, or None"""
+    while arr is not None and not isinstance(arr, np.memmap):
+        arr = arr.base
+    return arr.filename if arr is not None else None
+
+
+def test_shared_memory(tmp_path):
+    """Shared sources are backed by one memory-mapped copy"""
+    datapath = tmp_path / 'data'
+    datapath.mkdir()
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), datapath)
+    shutil.copy(os.path.join(TESTDATA, '..', '..', '..', 'data', 'stats.csv'), datapath)
+    conf = get_test_config()
+    conf.datapath = str(datapath)
+    share_dir = str(tmp_path / 'shared')
+
+    dm1 = DataManager(**conf, shared=True, share_dir=share_dir)
+    dm2 = DataManager(**conf, shared=True, share_dir=share_dir)
+    private = DataManager(**conf)
+
+    # both managers get the data of the private manager, backed by the same read-only files
+    weather1, weather2 = dm1.read('weather'), dm2.read('weather')
+    xr.testing.assert_identical(weather1, private.read('weather').load())
+    assert _memmap_file(weather1['Emden'].values) == _memmap_file(weather2['Emden'].values) is not None
+    assert not weather1['Emden'].values.flags.writeable
+
+    stats1, stats2 = dm1.read('stats'), dm2.read('stats')
+    pd.testing.assert_frame_equal(stats1, private.read('stats'))
+    assert _memmap_file(stats1['lat'].to_numpy()) == _memmap_file(stats2['lat'].to_numpy()) is not None
+
+    # the shared folders are removed with the last reference
+    assert len(os.listdir(share_dir)) == 2
+    dm1['weather'].evict()
+    assert len(os.listdir(share_dir)) == 2
+    dm2['weather'].evict()
+    assert len(os.listdir(share_dir)) == 1
+    assert oct(os.stat(share_dir).st_mode & 0o777) == oct(0o700)
+
+    # folders writable by others are not used, the data is loaded privately
+    open_dir = tmp_path / 'open'
+    open_dir.mkdir()
+    os.chmod(open_dir, 0o777)
+    dm3 = DataManager(**conf, shared=True, share_dir=str(open_dir))
+    with pytest.warns(UserWarning):
+        assert _memmap_file(dm3.read('weather')['Emden'].values) is None
+    assert os.listdir(open_dir) == []
+
+
+def test_csv_schema_and_side_cache(tmp_path):
+    """CSV schemas are applied and warm loads come from the side-cache"""
+    pd.DataFrame({
+        'time': pd.date_range('2000-01-01', periods=50, freq='D'),
+        'RCP': ['rcp45', 'rcp85'] * 25,
+        'value': range(50)
+    }).to_csv(tmp_path / 'sim.csv', index=False)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    conf.sources_args = {'sim.csv': dict(index_col=0, parse_dates=[0], dtype={'value': 'float32'}, categorical=['RCP'], engine='pyarrow')}
+    
+    sim = DataManager(**conf).read('sim')
+    assert isinstance(sim.index, pd.DatetimeIndex)
+    assert sim.RCP.dtype == 'category'
+    assert sim.value.dtype == 'float32'
+    cache = DataManager(**conf)['sim'].side_cache_path
+    assert os.path.exists(cache)
+
+    # warm loads don't parse the file
+    src = DataManager(**conf)['sim']
+    src._load_source = None
+    pd.testing.assert_frame_equal(src.read(), sim)
+    pd.testing.assert_frame_equal(src._filter(columns=['value'], attrs={'RCP': 'rcp45'}), sim.loc[sim.RCP == 'rcp45', ['value']])
+
+    # a changed file replaces the side-cache
+    sim.iloc[:10].to_csv(tmp_path / 'sim.csv')
+    assert len(DataManager(**conf).read('sim')) == 10
+    assert not os.path.exists(cache)
+
+
+def test_downcast_policy():
+    """Sources with a dtype policy are downcasted on load"""
+    conf = get_test_config()
+    conf.sources_args['weather.nc'] = dict(downcast='float32')
+    dm = DataManager(**conf)
+    weather = dm.read('weather')
+    assert all(v.dtype == 'float32' for v in weather.data_vars.values())
+
+    # the memory footprint before and after the cast is reported
+    stats = dm['weather'].stats
+    assert stats['nbytes_cast'] < stats['nbytes_raw']
+    assert stats['nbytes'] == stats['nbytes_cast']
+
+    # the policy is off by default
+    assert DataManager(**get_test_config()).read('weather')['coast'].dtype == 'float64'
+
+
+def test_report():
+    """The DataManager reports load and read telemetry per source"""
+    dm = DataManager(**get_test_config())
+    dm.read('weather')
+    dm.read('weather')
+    dm.filter('cordex_coast', vars='T')
+
+    report = dm.report()
+    assert set(report.keys()) == set(dm.datasources)
+    weather = report['weather']
+    assert weather['source'] == 'HDF5Source' and weather['loaded']
+    assert weather['loads'] == 1 and weather['reads'] == 2
+    assert weather['hits'] == 1 and weather['misses'] == 1
+    assert weather['bytes_read'] == os.path.getsize(os.path.join(TESTDATA, 'weather.nc'))
+    assert weather['load_time'] > 0 and weather['last_access'] is not None
+    assert report['cordex_coast']['filters'] == 1
+    assert report['cordex_krummh']['reads'] == 0 and report['cordex_krummh']['nbytes'] == 0
+
+
+def test_aggregation_pyramid(tmp_path):
+    """Aggregates from the pyramid match the on-the-fly aggregation"""
+    for fname in ('weather.nc', 'cordex_coast.nc'):
+        shutil.copy(os.path.join(TESTDATA, fname), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    daily = DataManager(**conf)
+
+    paths = build_pyramids(datapath=str(tmp_path))
+    assert len(paths) == 2
+    dm = DataManager(**conf)
+    assert 'weather_pyramid' in dm.datasources
+
+    for freq in ('M', '1Y'):
+        for how in ('min', 'mean', 'max', 'sum'):
+            xr.testing.assert_allclose(dm.aggregate('weather', 'T', freq=freq, how=how), daily.aggregate('weather', 'T', freq=freq, how=how))
+    
+    # compare to pandas
+    coast = dm.aggregate('weather', 'Tmax', freq='M', how='max', station='coast').to_series()
+    expected = daily.read('weather')['coast'].sel(vars='Tmax').to_series().resample('ME').max()
+    pd.testing.assert_series_equal(coast, expected, check_names=False, check_freq=False)
+
+    # attribute filters
+    rcp = dm.aggregate('cordex_coast', 'T', freq='Y', attrs={'RCP': 'rcp45'})
+    assert all(rcp[v].attrs['RCP'] == 'rcp45' for v in rcp.data_vars)
+
+    # pyramids older than the daily source are not used
+    filters = dm['weather_pyramid'].stats['filters']
+    stamp = os.stat(tmp_path / 'weather_pyramid.nc').st_mtime_ns
+    os.utime(tmp_path / 'weather.nc', ns=(stamp + 10**9, stamp + 10**9))
+    xr.testing.assert_allclose(dm.aggregate('weather', 'T', freq='Y'), daily.aggregate('weather', 'T', freq='Y'))
+    assert dm['weather_pyramid'].stats['filters'] == filters
+
+
+def test_async_read():
+    """Sources can be read concurrently by the async API"""
+    dm = DataManager(**get_test_config())
+
+    async def page():
+        data = await dm.aread_many(['weather', 'cordex_coast', 'climate'])
+        sub = await dm.afilter('weather', station='coast', vars='T')
+        source = await dm['cordex_krummh'].aread()
+        return data, sub, source
+
+    data, sub, source = asyncio.run(page())
+    assert list(data.keys()) == ['weather', 'cordex_coast', 'climate']
+    assert _same_buffers(data['climate'], source) and _same_buffers(source, dm.read('cordex_krummh'))
+    xr.testing.assert_equal(sub, dm.filter('weather', station='coast', vars='T'))
+
+    # sync wrapper
+    many = dm.read_many(['weather', 'cordex_coast'])
+    assert _same_buffers(many['weather'], data['weather'])
+
+
+def test_http_source(tmp_path):
+    """Remote sources are fetched on first read and revalidated"""
+    with serve_directory(TESTDATA) as server:
+        conf = get_test_config()
+        conf.remote_sources = {'remote_weather': dict(url=f'{server.url}/weather.nc', revalidate_interval=0)}
+        dm = DataManager(**conf, remote_cache_dir=str(tmp_path))
+        assert isinstance(dm['remote_weather'], HTTPSource)
+        assert not os.path.exists(dm['remote_weather'].path)
+        assert dm['remote_weather'].version is None
+
+        # downloaded on first read
+        xr.testing.assert_equal(dm.read('remote_weather'), dm.read('weather'))
+        sub = dm.filter('remote_weather', station='coast', vars='Tmax')
+        xr.testing.assert_equal(sub, dm.filter('weather', station='coast', vars='Tmax'))
+
+        # the reads were revalidated, but not downloaded again
+        stats = dm['remote_weather'].stats
+        assert stats['fetches'] == 1 and stats['not_modified'] == 1
+        assert stats['bytes_downloaded'] == os.path.getsize(os.path.join(TESTDATA, 'weather.nc'))
+        assert stats['hits'] == 1 and stats['misses'] == 1
+
+        # the version is revalidated without a download
+        assert dm['remote_weather'].version is not None
+        assert dm['remote_weather'].stats['not_modified'] == 1
+        assert server.methods[-1] == 'HEAD'
+    
+    # the local copy is used, if the server is gone
+    with pytest.warns(UserWarning):
+        assert isinstance(dm.read('remote_weather'), xr.Dataset)
+
+
+def test_http_source_version(tmp_path):
+    """The version of a remote source changes with the file on the server"""
+    (tmp_path / 'server').mkdir()
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path / 'server')
+    with serve_directory(str(tmp_path / 'server')) as server:
+        conf = get_test_config()
+        conf.remote_sources = {'remote_weather': dict(url=f'{server.url}/weather.nc')}
+        dm = DataManager(**conf, remote_cache_dir=str(tmp_path / 'cache'), check_interval=0)
+        dm.read('remote_weather')
+        version = dm.version('remote_weather')
+        assert dm.version('remote_weather') == version
+
+        # changed on the server, but not downloaded yet
+        stamp = os.stat(tmp_path / 'server' / 'weather.nc').st_mtime_ns + 10**9
+        os.utime(tmp_path / 'server' / 'weather.nc', ns=(stamp, stamp))
+        assert dm.version('remote_weather') != version
+        assert dm['remote_weather'].stats['fetches'] == 1
+
+        # the download keeps the new version
+        version = dm.version('remote_weather')
+        dm['remote_weather'].revalidate(force=True)
+        assert dm['remote_weather'].stats['fetches'] == 2
+        assert dm.version('remote_weather') == version
+
+
+def test_database_source(tmp_path):
+    """Imported tables replace their CSV source and filters run as SQL"""
+    pd.DataFrame({
+        'time': pd.date_range('2000-01-01', periods=50, freq='D'),
+        'RCP': ['rcp45', 'rcp85'] * 25,
+        'joint': [True, False] * 25,
+        'value': np.arange(50, dtype='float32')
+    }).to_csv(tmp_path / 'sim.csv', index=False)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    conf.sources_args = {'sim.csv': dict(index_col=0, parse_dates=[0], categorical=['RCP'], downcast='float32')}
+    csv = DataManager(**conf).read('sim')
+
+    assert import_sources(config=conf) == [str(tmp_path / 'sim.sqlite')]
+
+    # the database takes precedence and restores the table
+    dm = DataManager(**conf)
+    assert isinstance(dm['sim'], DatabaseSource)
+    sub = dm.filter('sim', columns=['value'], attrs={'RCP': 'rcp45', 'joint': True}, time=slice('2000-01-10', '2000-01'))
+    assert not dm['sim'].is_loaded
+    pd.testing.assert_frame_equal(dm.read('sim'), csv)
+    pd.testing.assert_frame_equal(sub, csv.loc[csv.RCP == 'rcp45', ['value']].loc['2000-01-10':'2000-01'])
+
+    # the import can be repeated
+    assert import_sources(config=conf, names=['sim']) == [str(tmp_path / 'sim.sqlite')]
+
+
+def test_snapshot_restore(tmp_path):
+    """Unchanged sources are restored from a snapshot"""
+    (tmp_path / 'data').mkdir()
+    for fname in ('weather.nc', 'cordex_coast.nc'):
+        shutil.copy(os.path.join(TESTDATA, fname), tmp_path / 'data')
+    conf = get_test_config()
+    conf.datapath = str(tmp_path / 'data')
+    dm = DataManager(**conf)
+    weather = dm.read('weather')
+    dm.read('cordex_coast')
+    
+    snap = str(tmp_path / 'snapshot')
+    assert sorted(dm.snapshot(snap)) == ['cordex_coast', 'weather']
+
+    # a new instance is warm without loading
+    dm2 = DataManager(**conf, snapshot_path=snap)
+    assert dm2['weather'].is_loaded and dm2['cordex_coast'].is_loaded
+    xr.testing.assert_identical(dm2.read('weather'), weather)
+    assert dm2['weather'].stats['loads'] == 0
+
+    # changed files and configs are loaded from disk
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path / 'data' / 'cordex_coast.nc')
+    conf.sources_args['weather.nc'] = dict(downcast='float16')
+    dm3 = DataManager(**conf, snapshot_path=snap)
+    assert not dm3['weather'].is_loaded and not dm3['cordex_coast'].is_loaded
+    assert dm3.read('weather')['coast'].dtype == 'float16'
+
+
+def test_read_only_views(tmp_path):
+    """Reads return read-only views of the cached data"""
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path)
+    shutil.copy(os.path.join(TESTDATA, '..', '..', '..', 'data', 'stats.csv'), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf)
+    weather = dm.read('weather')
+    
+    # the buffers are shared, but not writeable
+    assert _same_buffers(weather, dm.read('weather'))
+    with pytest.raises(ValueError):
+        weather['coast'].values[0, 0] = 42.
+    
+    # adding variables does not change the cache
+    weather['new'] = weather['coast'] * 2
+    assert 'new' not in dm.read('weather')
+
+    # copies are writeable
+    copy = dm.read('weather', copy=True)
+    copy['coast'].values[0, 0] = 42.
+    assert dm.read('weather')['coast'].values[0, 0] != 42.
+    
+    # same for tables
+    stats = dm.read('stats')
+    stats['ms'] = 15.
+    assert 'ms' not in dm.read('stats').columns
+
+    # the cached buffers are not writeable, views are copied on write
+    assert not any(arr.flags.writeable for arr in dm['stats'].data._mgr.arrays if isinstance(arr, np.ndarray))
+    lat = stats['lat'].iloc[0]
+    stats.loc[stats.index[0], 'lat'] = lat + 1
+    assert dm.read('stats')['lat'].iloc[0] == lat
+
+
+def test_single_flight_load():
+    """Concurrent reads of a cold source share a single load"""
+    dm = DataManager(**get_test_config())
+    source = dm['weather']
+    original = source._load
+    calls = []
+    
+    def slow_load():
+        calls.append(1)
+        time.sleep(0.2)
+        if len(calls) == 1:
+            raise RuntimeError('broken file')
+        return original()
+    source._load = slow_load
+
+    def read_all():
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(dm.read, 'weather') for _ in range(8)]
+            return [f.exception() or f.result() for f in futures]
+
+    # errors are propagated to all waiting readers
+    results = read_all()
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    
+    # the next read loads again
+    results = read_all()
+    assert len(calls) == 2
+    assert all(isinstance(r, xr.Dataset) for r in results)
+    assert source.stats['deduplicated'] == 14 and source.stats['loads'] == 1
+
+
+def test_version_invalidates_memoized(tmp_path):
+    """Memoized results are invalidated by changed data of the read sources only"""
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path)
+    shutil.copy(os.path.join(TESTDATA, '..', '..', '..', 'data', 'stats.csv'), tmp_path)
+    conf = get_test_config()
+    conf.datapath = str(tmp_path)
+    dm = DataManager(**conf, check_interval=None)
+
+    # the version is available before the first read and stable across managers
+    assert dm.version('stats') is not None
+    assert dm.version('stats') == DataManager(**conf).version('stats')
+    assert dm.version('nope') is None
+
+    calls = []
+
+    @partial_memoize(hash_names=['column'], sources=['stats'])
+    def count(dataManager, column):
+        calls.append(column)
+        return int(dataManager.read('stats')[column].sum())
+
+    @partial_memoize(hash_names=[], sources=['weather'])
+    def stations(dataManager):
+        calls.append('weather')
+        return list(dataManager.read('weather').data_vars)
+
+    count(dm, 'krummhoern'); stations(dm)
+    count(dm, 'krummhoern'); stations(dm)
+    assert len(calls) == 2
+
+    # change the stats file
+    weather_version = dm.version('weather')
+    stats = pd.read_csv(os.path.join(tmp_path, 'stats.csv'))
+    stats.iloc[:1].to_csv(os.path.join(tmp_path, 'stats.csv'), index=False)
+    dm['stats'].refresh(wait=True)
+
+    assert dm.version('weather') == weather_version
+    count(dm, 'krummhoern'); stations(dm)
+    assert calls == ['krummhoern', 'weather', 'krummhoern']
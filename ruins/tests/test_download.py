@@ -0,0 +1,139 @@
+"""
+Test the streamed data archive download against a local HTTP server
+"""
+import os
+import zipfile
+import hashlib
+import pytest
+
+from ruins.core import download_data_archive
+from ruins.core.download import download_file, extract_archive, fetch
+from ruins.tests.util import serve_directory, RangeRequestHandler
+
+
+def _make_archive(tmp_path) -> str:
+    """Create a data.zip with a data folder, like the data archive"""
+    archive = tmp_path / 'server' / 'data.zip'
+    archive.parent.mkdir()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for i in range(10):
+            zf.writestr(f'data/file_{i}.csv', os.urandom(20000 * (i + 1)))
+        zf.writestr('data/sub/nested.txt', 'nested')
+    return str(archive)
+
+
+def _md5(path) -> str:
+    with open(path, 'rb') as f:
+        return 'md5:' + hashlib.md5(f.read()).hexdigest()
+
+
+def test_download_resume(tmp_path):
+    """An interrupted download is resumed with a Range request"""
+    archive = _make_archive(tmp_path)
+    target = str(tmp_path / 'download.zip')
+
+    # simulate an interrupted download
+    with open(archive, 'rb') as f:
+        content = f.read()
+    with open(f'{target}.part', 'wb') as f:
+        f.write(content[:1000])
+
+    with serve_directory(str(tmp_path / 'server')) as server:
+        download_file(f'{server.url}/data.zip', target, checksum=_md5(archive), progress=None)
+
+    assert server.requests[-1]['Range'] == 'bytes=1000-'
+    assert not os.path.exists(f'{target}.part')
+    with open(target, 'rb') as f:
+        assert f.read() == content
+
+
+def test_download_checksum_mismatch(tmp_path):
+    """Corrupt downloads are removed"""
+    archive = _make_archive(tmp_path)
+    target = str(tmp_path / 'download.zip')
+
+    with serve_directory(str(tmp_path / 'server')) as server:
+        with pytest.raises(IOError):
+            download_file(f'{server.url}/data.zip', target, checksum='md5:0123456789abcdef', progress=None)
+    
+    assert not os.path.exists(target)
+    assert not os.path.exists(f'{target}.part')
+
+
+def test_extract_archive(tmp_path):
+    """Members are extracted in parallel, path traversal is rejected"""
+    archive = _make_archive(tmp_path)
+    names = extract_archive(archive, str(tmp_path / 'out'), workers=3, progress=None)
+    
+    assert len(names) == 11
+    with zipfile.ZipFile(archive) as zf:
+        for name in names:
+            with open(tmp_path / 'out' / name, 'rb') as f:
+                assert f.read() == zf.read(name)
+
+    # path traversal
+    evil = tmp_path / 'evil.zip'
+    with zipfile.ZipFile(evil, 'w') as zf:
+        zf.writestr('../evil.txt', 'evil')
+    with pytest.raises(IOError):
+        extract_archive(str(evil), str(tmp_path / 'out'), progress=None)
+
+
+def test_download_data_archive(tmp_path):
+    """The data archive is downloaded and extracted into the data folder"""
+    archive = _make_archive(tmp_path)
+    datapath = tmp_path / 'app' / 'data'
+
+    with serve_directory(str(tmp_path / 'server')) as server:
+        download_data_archive(path=str(datapath), url=f'{server.url}/data.zip', checksum=_md5(archive))
+    
+    assert len(os.listdir(datapath)) == 11
+    assert not os.path.exists(tmp_path / 'app' / '.data.zip')
+
+
+def test_fetch_ranges_and_revalidation(tmp_path):
+    """Large files are fetched by concurrent ranges and only transferred again if changed"""
+    (tmp_path / 'server').mkdir()
+    remote = tmp_path / 'server' / 'data.bin'
+    remote.write_bytes(os.urandom(300000))
+    local = str(tmp_path / 'cache' / 'data.bin')
+
+    with serve_directory(str(tmp_path / 'server')) as server:
+        assert fetch(f'{server.url}/data.bin', local, workers=4, range_size=50000)
+        ranges = [r['Range'] for r in server.requests if 'Range' in r]
+        assert len(ranges) == 4
+
+        # the size is probed without transferring the file
+        assert server.methods == ['HEAD', 'GET', 'GET', 'GET', 'GET']
+        with open(local, 'rb') as f:
+            assert f.read() == remote.read_bytes()
+
+        # the local copy is still valid
+        assert not fetch(f'{server.url}/data.bin', local, workers=4, range_size=50000)
+        assert 'If-None-Match' in server.requests[-1]
+
+        # a changed file is transferred again
+        remote.write_bytes(b'changed')
+        assert fetch(f'{server.url}/data.bin', local, workers=4, range_size=50000)
+        with open(local, 'rb') as f:
+            assert f.read() == b'changed'
+
+
+class NoHeadHandler(RangeRequestHandler):
+    def do_HEAD(self):
+        self.send_error(501)
+
+
+def test_fetch_without_head(tmp_path):
+    """Servers without HEAD support are probed with a range request"""
+    (tmp_path / 'server').mkdir()
+    remote = tmp_path / 'server' / 'data.bin'
+    remote.write_bytes(os.urandom(300000))
+    local = str(tmp_path / 'cache' / 'data.bin')
+
+    with serve_directory(str(tmp_path / 'server'), handler=NoHeadHandler) as server:
+        assert fetch(f'{server.url}/data.bin', local, workers=4, range_size=50000)
+        ranges = [r['Range'] for r in server.requests if 'Range' in r]
+        assert ranges[0] == 'bytes=0-0' and len(ranges) == 5
+        with open(local, 'rb') as f:
+            assert f.read() == remote.read_bytes()
@@ -0,0 +1,98 @@
+"""
+Test the process-wide DataManager registry
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ruins.core import build_config
+from ruins.core.build import url_kwargs
+from ruins.core.registry import DataManagerRegistry, REGISTRY, fingerprint
+from ruins.tests.util import get_test_config
+
+
+def test_fingerprint():
+    """Only the DataManager arguments and source settings identify a DataManager"""
+    conf = get_test_config()
+    fp = fingerprint(conf)
+    
+    conf.lang = 'de'
+    assert fingerprint(conf) == fp
+
+    conf.sources_args = {**conf.sources_args, 'weather.nc': dict(lazy=True)}
+    assert fingerprint(conf) != fp
+    fp = fingerprint(conf)
+
+    # all arguments of the DataManager
+    for key, value in dict(memory_budget=2**20, hot_load_workers=2, columnar=True, snapshot_path='snap').items():
+        conf[key] = value
+        assert fingerprint(conf) != fp
+        fp = fingerprint(conf)
+
+    # source classes overwritten by file name
+    conf['weather'] = 'ZarrSource'
+    assert fingerprint(conf) != fp
+
+
+def test_registry_reuse():
+    """The registry hands out one instance per fingerprint"""
+    registry = DataManagerRegistry()
+    events = []
+    for event in ('create', 'reuse', 'release'):
+        registry.register_hook(event, lambda dm, fp, event=event: events.append(event))
+
+    conf = get_test_config()
+    with ThreadPoolExecutor(4) as pool:
+        managers = list(pool.map(lambda _: registry.get(**conf), range(8)))
+    
+    assert all(dm is managers[0] for dm in managers)
+    assert registry.stats() == dict(created=1, reused=7, released=0, instances=1)
+    assert events.count('create') == 1
+
+    # released instances are created again
+    assert registry.release(managers[0])
+    assert managers[0] not in registry
+    assert registry.get(**conf) is not managers[0]
+    assert registry.stats()['created'] == 2
+    assert events[-2:] == ['release', 'create']
+
+
+def test_build_config_reuses_manager():
+    """build_config uses the process-wide registry"""
+    REGISTRY.clear()
+    conf = get_test_config()
+    _, dm1 = build_config(**conf)
+    _, dm2 = build_config(**conf)
+    assert dm1 is dm2
+    REGISTRY.clear()
+
+
+def test_registry_bounded():
+    """The least recently used instances are released, creation does not block other fingerprints"""
+    started, proceed = threading.Event(), threading.Event()
+    class Slow:
+        def __init__(self, **kwargs):
+            if kwargs.get('slow'):
+                started.set()
+                proceed.wait(5)
+        def stop_watcher(self):
+            self.stopped = True
+
+    registry = DataManagerRegistry(factory=Slow, max_instances=2)
+    with ThreadPoolExecutor(1) as pool:
+        slow = pool.submit(registry.get, datapath='/slow', slow=True)
+        started.wait(5)
+        a = registry.get(datapath='/a')
+        proceed.set()
+        slow = slow.result()
+
+    registry.get(datapath='/slow')
+    c = registry.get(datapath='/c')
+    assert a not in registry and a.stopped
+    assert slow in registry and c in registry
+    assert registry.stats() == dict(created=3, reused=1, released=1, instances=2)
+
+
+def test_url_params_sanitized():
+    """URL parameters can't configure the DataManager"""
+    params = dict(lang=['de'], debug=['true'], memory_budget=['1'], snapshot_path=['/tmp/x'], weather=['ZarrSource'])
+    assert url_kwargs(params) == dict(lang='de', debug='true')
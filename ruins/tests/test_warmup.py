@@ -0,0 +1,58 @@
+"""
+Test the cache warm-up
+"""
+import os
+import shutil
+
+import pytest
+
+from ruins.core import DataManager, Config
+from ruins.core.warmup import warm_cache, weather_tasks, climate_indices_tasks, sunburst_tasks, windpower_tasks
+
+TESTDATA = os.path.join(os.path.dirname(__file__), 'testdata')
+
+
+def test_task_grids(tmp_path):
+    """The grids are enumerated from the available sources"""
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), tmp_path)
+    dm = DataManager(**Config(datapath=str(tmp_path)))
+
+    stations = list(dm.read('weather').data_vars)
+    assert len(weather_tasks(dm)) == (len(stations) + 1) * 3 * 2
+
+    # the climate projections are missing
+    assert climate_indices_tasks(dm) == []
+    assert sunburst_tasks(dm) == []
+    assert windpower_tasks(dm) == []
+
+
+def test_task_grids_all_sources(tmp_path):
+    """Datasets are found by their Config.datafile_names alias"""
+    for fname in ('weather.nc', 'cordex_coast.nc', 'cordex_krummh.nc'):
+        shutil.copy(os.path.join(TESTDATA, fname), tmp_path)
+    # the grid does not depend on the content of the wind timeseries
+    (tmp_path / 'windenergy_timeseries.csv').write_text('year,RCP\n')
+    dm = DataManager(**Config(datapath=str(tmp_path)))
+
+    from ruins.apps.sunburst import ORDERS
+    from ruins.processing.climate_indices import INDICES
+    stations = list(dm.read('weather').data_vars)
+    assert len(climate_indices_tasks(dm)) == len(stations) * len(INDICES)
+    assert len(weather_tasks(dm)) == (len(stations) + 1) * 3 * 2 + 3 * 3 * 2
+    assert len(sunburst_tasks(dm)) == len(ORDERS)
+    assert len(windpower_tasks(dm)) == 2
+
+
+def test_warm_cache(tmp_path):
+    """The results are persisted into the cache folder"""
+    datapath = tmp_path / 'data'
+    datapath.mkdir()
+    shutil.copy(os.path.join(TESTDATA, 'weather.nc'), datapath)
+    cache_dir = str(tmp_path / 'cache')
+
+    summary = warm_cache(datapath=str(datapath), workers=2, cache_dir=cache_dir, groups=['weather'])
+    assert summary['failed'] == []
+    assert len(os.listdir(os.path.join(cache_dir, 'ruins.apps.weather._reduce_weather_data'))) == summary['results'] > 0
+
+    with pytest.raises(ValueError):
+        warm_cache(groups=['nope'])
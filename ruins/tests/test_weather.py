@@ -30,3 +30,12 @@ def test_climate_indi():
 
     # run
     weather.climate_indi(w, 'Ice days (Tmax < 0°C)')
+
+
+def test_reduce_weather_data():
+    """Reduce the weather data for one station"""
+    dm = DataManager(**get_test_config())
+    df = weather._reduce_weather_data(dm, name='weather', station='coast', variable='Tmax', time='1MS')
+
+    expected = dm.read('weather')['coast'].sel(vars='Tmax').to_series().resample('1MS').max()
+    assert (df.values == expected.values).all()
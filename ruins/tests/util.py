@@ -1,4 +1,10 @@
 import os
+import threading
+from functools import partial
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
 from ruins.core import Config
 
 def get_test_config() -> Config:
@@ -9,3 +15,94 @@ def get_test_config() -> Config:
         debug=True
     )
     return Config(**args)
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Minimal stand-in for a download server. Serves a folder and supports
+    single HTTP Range requests, ETag and Last-Modified validation. All
+    request headers are logged to the ``requests`` list of the server and
+    the request methods to the ``methods`` list.
+    """
+    def log_message(self, *args):
+        pass
+
+    def send_head(self):
+        self.server.requests.append(dict(self.headers))
+        self.server.methods.append(self.command)
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return None
+        
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns}-{size}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        # conditional requests
+        if self.headers.get('If-None-Match') == etag or (self.headers.get('If-None-Match') is None and self.headers.get('If-Modified-Since') == last_modified):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return None
+
+        f = open(path, 'rb')
+        
+        # full file
+        rng = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if rng is None or (if_range is not None and if_range not in (etag, last_modified)):
+            self.send_response(200)
+            self.send_header('Content-Length', str(size))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return f
+        
+        # partial content
+        start, end = rng.split('=')[1].split('-')
+        start, end = int(start), int(end) if end else size - 1
+        if start >= size:
+            f.close()
+            self.send_error(416)
+            return None
+        f.seek(start)
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        return _Slice(f, end - start + 1)
+
+
+class _Slice:
+    """File wrapper, which reads at most length bytes"""
+    def __init__(self, f, length: int):
+        self.f, self.remaining = f, length
+
+    def read(self, size: int = -1) -> bytes:
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+@contextmanager
+def serve_directory(path: str, handler=RangeRequestHandler):
+    """Serve path on a local HTTP server with Range support and yield the server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory=path))
+    server.requests = []
+    server.methods = []
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -25,6 +25,9 @@ setup(
     author='Conrad Jackisch, Mirko Mälicke',
     author_email='Conrad.Jackisch@tbt.tu-freiberg.de, mirko@hydrocode.de',
     install_requires=requirements(),
-    packages=find_packages()
+    packages=find_packages(),
+    entry_points={
+        'console_scripts': ['ruins=ruins.__main__:main']
+    }
 )
 